@@ -1,22 +1,44 @@
 """One-off debug: print product list and URLs from API."""
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-r = requests.get(
-    "https://www.bigbasket.com/custompage/sysgenpd/",
-    params={"type": "pc", "slug": "super-saver-sona-masoori-raw-rice-26-kg-bag"},
-    headers={"User-Agent": "Mozilla/5.0", "Referer": "https://www.bigbasket.com/"},
-    timeout=15,
-)
-data = r.json()
-tab = data["tab_info"][0]
-products = tab["product_info"]["products"]
-print("Count:", len(products))
-for i, p in enumerate(products):
-    url = p.get("absolute_url") or ""
-    pid = p.get("id") or p.get("sku")
-    desc = (p.get("p_desc") or "")[:50]
-    has_40300424 = "40300424" in url or str(pid) == "40300424"
-    print(i, "id/sku", pid, "40300424?" if has_40300424 else "", desc)
-    if has_40300424 or "super-saver-sona" in url.lower():
-        print("   URL:", url)
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SLUGS = ["super-saver-sona-masoori-raw-rice-26-kg-bag"]
+
+# One pooled session for all fetches (keep-alive: no TCP/TLS handshake per call)
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Mozilla/5.0", "Referer": "https://www.bigbasket.com/"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.3)))
+
+
+def fetch_products(slug: str) -> list:
+    r = SESSION.get(
+        "https://www.bigbasket.com/custompage/sysgenpd/",
+        params={"type": "pc", "slug": slug},
+        timeout=(3, 10),
+    )
+    data = r.json()
+    tab = data["tab_info"][0]
+    return tab["product_info"]["products"]
+
+
+def main(slugs=SLUGS):
+    with ThreadPoolExecutor(16) as ex:
+        for slug, products in zip(slugs, ex.map(fetch_products, slugs)):
+            print("Slug:", slug)
+            print("Count:", len(products))
+            for i, p in enumerate(products):
+                url = p.get("absolute_url") or ""
+                pid = p.get("id") or p.get("sku")
+                desc = (p.get("p_desc") or "")[:50]
+                has_40300424 = "40300424" in url or str(pid) == "40300424"
+                print(i, "id/sku", pid, "40300424?" if has_40300424 else "", desc)
+                if has_40300424 or "super-saver-sona" in url.lower():
+                    print("   URL:", url)
+
+
+if __name__ == "__main__":
+    main()
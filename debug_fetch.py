@@ -1,6 +1,4 @@
 """One-off: fetch one product page with Playwright and print __NEXT_DATA__ structure."""
-import json
-import re
 import sys
 from pathlib import Path
 
@@ -8,50 +6,99 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 import requests
 from tracker import set_location_session, _add_session_cookies_to_context, PAGE_HEADERS
+from next_data import DICT_TYPES, LIST_TYPES, loads, next_data_payload
 
-def main():
-    url = "https://www.bigbasket.com/pd/40300424/super-saver-sona-masoori-raw-rice-26-kg-bag/"
+TARGET_KEYS = frozenset({"store_availability", "availability", "pstat", "out_of_stock", "in_stock"})
+
+
+def find_keys(obj, targets=TARGET_KEYS):
+    """Yield (path, value) for every key in targets (iterative DFS over dicts and all list items)."""
+    stack = [("", obj)]
+    while stack:
+        path, cur = stack.pop()
+        if isinstance(cur, DICT_TYPES):
+            for k, v in cur.items():
+                p = f"{path}.{k}"
+                if k in targets:
+                    yield p, v
+                if isinstance(v, DICT_TYPES) or isinstance(v, LIST_TYPES):
+                    stack.append((p, v))
+        elif isinstance(cur, LIST_TYPES):
+            for i, v in enumerate(cur):
+                if isinstance(v, DICT_TYPES) or isinstance(v, LIST_TYPES):
+                    stack.append((f"{path}[{i}]", v))
+
+
+URLS = [
+    "https://www.bigbasket.com/pd/40300424/super-saver-sona-masoori-raw-rice-26-kg-bag/",
+]
+
+
+_PAGE_SNAPSHOT_JS = """() => {
+    var s = document.getElementById('__NEXT_DATA__');
+    return [document.documentElement.outerHTML.slice(0, 150000), s ? s.textContent : null];
+}"""
+
+
+def fetch_html(context, url):
+    """
+    Open url in a new page of the shared context once __NEXT_DATA__ is in the DOM.
+    Returns (html_prefix, next_data_text): first 150k chars of HTML and the raw __NEXT_DATA__ JSON (or None),
+    both read in the page so the full HTML is never serialized back to Python.
+    """
+    page = context.new_page()
+    try:
+        page.goto(url, wait_until="domcontentloaded", timeout=20000)
+        try:
+            page.wait_for_selector("script#__NEXT_DATA__", state="attached", timeout=8000)
+        except Exception:
+            pass
+        html_prefix, next_data = page.evaluate(_PAGE_SNAPSHOT_JS)
+        return html_prefix, next_data
+    finally:
+        page.close()
+
+
+def report(html_prefix, next_data, out_name="debug_product.html"):
+    # Save HTML sample
+    buf = html_prefix.encode("utf-8")
+    Path(out_name).write_bytes(buf)
+    print(f"Wrote {out_name} (first 150k chars)")
+    # Parse __NEXT_DATA__ (read in page; else a bytes scan over the saved prefix)
+    payload = next_data or next_data_payload(buf)
+    if payload is None:
+        print("No __NEXT_DATA__ found")
+        return
+    data = loads(payload)
+    props = data.get("props", {}).get("pageProps", {})
+    print("pageProps keys:", list(props.keys()))
+    # Look for store_availability anywhere
+    for path, v in find_keys(props):
+        print(f"  Found at {path}: {repr(v)[:200]}")
+
+
+def main(urls=URLS):
     pincode = "122001"
     from playwright.sync_api import sync_playwright
     session = set_location_session(pincode)
     with sync_playwright() as p:
+        # One browser + context for all URLs; cookies are warmed once
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(user_agent=PAGE_HEADERS.get("User-Agent", ""))
         try:
             page = context.new_page()
-            page.goto("https://www.bigbasket.com/", wait_until="load", timeout=10000)
+            page.goto("https://www.bigbasket.com/", wait_until="domcontentloaded", timeout=10000)
             page.close()
         except Exception:
             pass
         _add_session_cookies_to_context(context, session)
-        page = context.new_page()
-        page.goto(url, wait_until="load", timeout=20000)
-        import time
-        time.sleep(3)
-        html = page.content()
-        page.close()
-        browser.close()
-    # Save HTML sample
-    Path("debug_product.html").write_text(html[:150000], encoding="utf-8")
-    print("Wrote debug_product.html (first 150k chars)")
-    # Parse __NEXT_DATA__
-    m = re.search(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>', html)
-    if not m:
-        print("No __NEXT_DATA__ found")
-        return
-    data = json.loads(m.group(1))
-    props = data.get("props", {}).get("pageProps", {})
-    print("pageProps keys:", list(props.keys()))
-    # Look for store_availability anywhere
-    def find_keys(obj, path=""):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if k in ("store_availability", "availability", "pstat", "out_of_stock", "in_stock"):
-                    print(f"  Found at {path}.{k}: {repr(v)[:200]}")
-                find_keys(v, f"{path}.{k}")
-        elif isinstance(obj, list) and obj and isinstance(obj[0], dict):
-            find_keys(obj[0], f"{path}[0]")
-    find_keys(props)
+        try:
+            pages = [fetch_html(context, u) for u in urls]
+        finally:
+            browser.close()
+    for i, (url, (html_prefix, next_data)) in enumerate(zip(urls, pages)):
+        print("==", url)
+        report(html_prefix, next_data, "debug_product.html" if len(urls) == 1 else f"debug_product_{i}.html")
 
 if __name__ == "__main__":
     main()
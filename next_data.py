@@ -0,0 +1,28 @@
+"""Shared __NEXT_DATA__ helpers for the debug scripts (debug_fetch.py, test_next_api.py)."""
+import json
+
+try:
+    import simdjson
+    _PARSER = simdjson.Parser()
+    DICT_TYPES = (dict, simdjson.Object)
+    LIST_TYPES = (list, simdjson.Array)
+
+    def loads(raw):
+        """Parse JSON with simdjson; returns lazy Object/Array proxies (valid until the next parse)."""
+        return _PARSER.parse(raw.encode("utf-8") if isinstance(raw, str) else raw)
+except ImportError:
+    DICT_TYPES = (dict,)
+    LIST_TYPES = (list,)
+    loads = json.loads
+
+
+def next_data_payload(buf: bytes) -> bytes | None:
+    """Return the raw __NEXT_DATA__ JSON bytes via plain bytes.find (no regex over the whole page)."""
+    i = buf.find(b'id="__NEXT_DATA__"')
+    if i == -1:
+        return None
+    j = buf.find(b">", i) + 1
+    k = buf.find(b"</script>", j)
+    if j == 0 or k == -1:
+        return None
+    return buf[j:k]
@@ -10,10 +10,17 @@ Usage:
 import argparse
 import json
 import re
+import signal
 import sys
+import threading
 import time
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE = Path(__file__).resolve().parent
 RECORD_FILE = BASE / "pincode_session_record.json"
 
@@ -82,11 +89,14 @@ RECORD_JS = """
 
 
 def get_driver(enable_performance_log=True):
+    """
+    Start Chrome. With enable_performance_log, Chrome's performance log is enabled as the fallback network
+    capture for when the DevTools event channel (start_cdp_capture) cannot be opened.
+    """
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
         from selenium.webdriver.chrome.service import Service
-        from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
         from webdriver_manager.chrome import ChromeDriverManager
     except ImportError:
         print("Need: pip install selenium webdriver-manager", file=sys.stderr)
@@ -109,8 +119,42 @@ def get_driver(enable_performance_log=True):
         return None
 
 
+def start_cdp_capture(driver, network_events: list):
+    """
+    Subscribe to CDP Network events over Selenium's DevTools channel (tracker.cdp_listen), so they arrive
+    already parsed (no performance-log JSON round trip). Returns stop() for the listener, or None if unavailable.
+    """
+    from tracker import cdp_listen
+
+    async def setup(session, devtools):
+        await session.execute(devtools.network.enable())
+
+    def on_event(event):
+        if hasattr(event, "request"):
+            network_events.append({
+                "type": "request",
+                "url": event.request.url,
+                "method": event.request.method,
+                "requestId": str(event.request_id),
+            })
+        else:
+            network_events.append({
+                "type": "response",
+                "url": event.response.url,
+                "status": event.response.status,
+                "requestId": str(event.request_id),
+            })
+
+    return cdp_listen(
+        driver,
+        setup,
+        lambda devtools: (devtools.network.RequestWillBeSent, devtools.network.ResponseReceived),
+        on_event,
+    )
+
+
 def parse_performance_log(driver):
-    """Extract network requests/responses from Chrome performance log."""
+    """Fallback: extract network requests/responses from Chrome performance log."""
     try:
         logs = driver.get_log("performance")
     except Exception:
@@ -143,20 +187,63 @@ def parse_performance_log(driver):
     return network_events
 
 
+def _wait_for_stop(stop: threading.Event) -> None:
+    """Block until Enter is pressed or Ctrl+C is hit (SIGINT sets stop instead of raising)."""
+    def on_sigint(signum, frame):
+        stop.set()
+
+    def read_enter():
+        try:
+            sys.stdin.readline()
+        finally:
+            stop.set()
+
+    prev_handler = signal.signal(signal.SIGINT, on_sigint)
+    threading.Thread(target=read_enter, daemon=True).start()
+    try:
+        while not stop.wait(0.5):
+            pass
+    finally:
+        signal.signal(signal.SIGINT, prev_handler)
+
+
 def record_session(pincode_hint: str = "122001"):
     print("Opening BigBasket in Chrome...")
     driver = get_driver(enable_performance_log=True)
     if not driver:
         return False
     try:
+        network_live = []
+        stop_capture = start_cdp_capture(driver, network_live)
         driver.get("https://www.bigbasket.com/")
         driver.maximize_window()
         time.sleep(4)
         driver.execute_script(RECORD_JS)
         print("Recording: UI steps, network, and cookies.")
         print(f"Do your pincode flow (e.g. set pincode to {pincode_hint}).")
-        print("When done, press Enter HERE to save the session...")
-        input()
+        print("When done, press Enter (or Ctrl+C) HERE to save the session...")
+
+        # Drain the performance log every 2s so chromedriver never buffers the whole session. It is only
+        # parsed when it is the capture in use; with the CDP channel the entries are just discarded.
+        drained = []
+        stop = threading.Event()
+
+        def drain():
+            while not stop.wait(2):
+                if stop_capture is not None:
+                    try:
+                        driver.get_log("performance")
+                    except Exception:
+                        pass
+                else:
+                    drained.extend(parse_performance_log(driver))
+
+        drainer = threading.Thread(target=drain, daemon=True)
+        drainer.start()
+        _wait_for_stop(stop)
+        drainer.join(timeout=10)
+        if stop_capture is not None:
+            stop_capture()
 
         # Collect UI steps (from our script + sessionStorage backup)
         steps = []
@@ -180,8 +267,12 @@ def record_session(pincode_hint: str = "122001"):
                     continue
             steps_deduped.append(s)
 
-        # Network log
-        network = parse_performance_log(driver)
+        # Network: CDP events if subscribed, else the performance log
+        if stop_capture is not None:
+            network = list(network_live)
+        else:
+            drained.extend(parse_performance_log(driver))
+            network = drained
         # Filter to BigBasket API calls that matter for location
         location_apis = [e for e in network if "bigbasket.com" in e.get("url", "") and (
             "places/" in e.get("url", "") or "ui-svc" in e.get("url", "") or "serviceable" in e.get("url", "")
@@ -199,8 +290,11 @@ def record_session(pincode_hint: str = "122001"):
             "network_location_apis": location_apis,
             "network_sample": network[:50],
         }
-        with open(RECORD_FILE, "w", encoding="utf-8") as f:
-            json.dump(record, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            RECORD_FILE.write_bytes(orjson.dumps(record, option=orjson.OPT_INDENT_2))
+        else:
+            with open(RECORD_FILE, "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=2, ensure_ascii=False)
         print(f"Saved to {RECORD_FILE}:")
         print(f"  - {len(cookies)} cookies")
         print(f"  - {len(steps_deduped)} UI steps")
@@ -215,8 +309,11 @@ def verify_session(pincode: str):
     if not RECORD_FILE.exists():
         print(f"No record found at {RECORD_FILE}. Run without --verify first.", file=sys.stderr)
         return False
-    with open(RECORD_FILE, encoding="utf-8") as f:
-        record = json.load(f)
+    if orjson is not None:
+        record = orjson.loads(RECORD_FILE.read_bytes())
+    else:
+        with open(RECORD_FILE, encoding="utf-8") as f:
+            record = json.load(f)
     cookies = record.get("cookies", [])
     pin = (pincode or "").strip()
     if not pin:
@@ -1,47 +1,66 @@
 """Test Next.js product API and page data."""
 import requests
-import re
-import json
-
-# Fetch product page HTML
-url = "https://www.bigbasket.com/pd/10000074/fresho-cauliflower-1-pc/"
-r = requests.get(
-    url,
-    headers={
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0",
-        "Referer": "https://www.bigbasket.com/",
-    },
-    timeout=15,
-)
-print("Status", r.status_code)
-# Find __NEXT_DATA__
-m = re.search(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>', r.text)
-if m:
-    d = json.loads(m.group(1))
-    print("__NEXT_DATA__ keys", list(d.keys()))
-    if "buildId" in d:
-        print("buildId", d["buildId"])
-    props = d.get("props", {})
-    pageProps = props.get("pageProps", {})
-    if pageProps:
-        print("pageProps keys", list(pageProps.keys())[:30])
-        # Look for product / stock
-        for k in ["product", "productInfo", "initialData", "data"]:
-            if k in pageProps:
-                v = pageProps[k]
-                if isinstance(v, dict):
-                    print(k, "keys", list(v.keys())[:15])
-                else:
-                    print(k, type(v))
-else:
-    # Try alternate pattern
-    m2 = re.search(r"__NEXT_DATA__.*?>(.+?)</script>", r.text, re.DOTALL)
-    if m2:
-        try:
-            d = json.loads(m2.group(1).strip())
-            print("buildId", d.get("buildId"))
-            print("pageProps keys", list(d.get("props", {}).get("pageProps", {}).keys())[:20])
-        except Exception as e:
-            print("Parse err", e)
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from next_data import DICT_TYPES, loads, next_data_payload
+
+URLS = [
+    "https://www.bigbasket.com/pd/10000074/fresho-cauliflower-1-pc/",
+]
+
+# One pooled session for all fetches (keep-alive: no TCP/TLS handshake per page)
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0",
+    "Referer": "https://www.bigbasket.com/",
+})
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.3)))
+
+
+def fetch_next_data(url: str) -> requests.Response | None:
+    """Fetch one product page with the shared session. Returns the response or None on network error."""
+    try:
+        return SESSION.get(url, stream=False, timeout=(3, 10))
+    except requests.RequestException as e:
+        print("Fetch error", url, e)
+        return None
+
+
+def show(r: requests.Response) -> None:
+    print("Status", r.status_code)
+    # Find __NEXT_DATA__ with a bytes scan (no full-page decode or regex)
+    payload = next_data_payload(r.content)
+    if payload is not None:
+        d = loads(payload)
+        print("__NEXT_DATA__ keys", list(d.keys()))
+        if "buildId" in d:
+            print("buildId", d["buildId"])
+        props = d.get("props", {})
+        pageProps = props.get("pageProps", {})
+        if pageProps:
+            print("pageProps keys", list(pageProps.keys())[:30])
+            # Look for product / stock
+            for k in ["product", "productInfo", "initialData", "data"]:
+                if k in pageProps:
+                    v = pageProps[k]
+                    if isinstance(v, DICT_TYPES):
+                        print(k, "keys", list(v.keys())[:15])
+                    else:
+                        print(k, type(v))
     else:
-        print("No __NEXT_DATA__ found. Len:", len(r.text))
+        print("No __NEXT_DATA__ found. Len:", len(r.content))
+
+
+def main(urls=URLS):
+    with ThreadPoolExecutor(16) as ex:
+        for url, r in zip(urls, ex.map(fetch_next_data, urls)):
+            print("==", url)
+            if r is not None:
+                show(r)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,84 @@ Run: python tracker.py -c   (uses config.json)
 import argparse
 import base64
 import json
+import logging
+import os
+import queue
 import re
 import sys
+import threading
 import time
-import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from secrets import token_hex
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _json_loads = orjson.loads  # C parser, accepts str or bytes; its JSONDecodeError subclasses json's
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+try:
+    import ijson  # optional: stream large HAR exports entry by entry
+except ImportError:
+    ijson = None
+
+
+def _json(r: requests.Response):
+    """Decode a response body from its raw bytes (skips requests' charset detection and text decode)."""
+    return _json_loads(r.content)
+
+# -----------------------------------------------------------------------------
+# Output: everything goes through log; under the CLI the records go on an in-memory queue and a background
+# thread writes them, so worker/check code never blocks on console or file I/O
+# -----------------------------------------------------------------------------
+
+log = logging.getLogger("bb_tracker")
+_LOG_LISTENER: QueueListener | None = None
+
+
+def _setup_log_output(queued: bool = False) -> None:
+    """
+    Send log to the console (info to stdout, warnings to stderr, bare messages) unless already set up.
+    queued (the CLI): records go on an in-memory queue drained by a listener thread, stopped by _stop_log_output.
+    Nothing is configured at import, so code importing tracker keeps control of logging.
+    """
+    global _LOG_LISTENER
+    if log.handlers:
+        return
+    out = logging.StreamHandler(sys.stdout)
+    out.addFilter(lambda record: record.levelno < logging.WARNING)
+    err = logging.StreamHandler(sys.stderr)
+    err.setLevel(logging.WARNING)
+    for handler in (out, err):
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    if queued:
+        q = queue.SimpleQueue()
+        log.addHandler(QueueHandler(q))
+        _LOG_LISTENER = QueueListener(q, out, err, respect_handler_level=True)
+        _LOG_LISTENER.start()
+    else:
+        log.addHandler(out)
+        log.addHandler(err)
+
+
+def _stop_log_output() -> None:
+    """Flush and stop the queue listener (if main started one)."""
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        _LOG_LISTENER = None
 
 # -----------------------------------------------------------------------------
 # Paths
@@ -28,17 +99,28 @@ CONFIG_FILE = BASE / "config.json"
 STATE_FILE = BASE / "state.json"
 PINCODE_FLOW_FILE = BASE / "pincode_flow.json"
 PINCODE_SESSION_RECORD_FILE = BASE / "pincode_session_record.json"
+SESSION_CACHE_FILE = BASE / "session_cache.json"
 
 # -----------------------------------------------------------------------------
 # Headers (single set; keep it simple)
 # -----------------------------------------------------------------------------
 
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode Content-Encoding: br)
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip, deflate"
+
 UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 HEADERS = {
     "User-Agent": UA,
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "en-IN,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Encoding": _ACCEPT_ENCODING,
     "Connection": "keep-alive",
     "Referer": "https://www.bigbasket.com/",
 }
@@ -49,6 +131,77 @@ API_HEADERS = {
     "x-entry-context-id": "100",
 }
 
+# -----------------------------------------------------------------------------
+# Patterns (compiled once at import)
+# -----------------------------------------------------------------------------
+
+_PRODUCT_URL_RE = re.compile(r"bigbasket\.com/pd/(\d+)/([^/?]+)", re.I)
+_NEXT_DATA_RE = re.compile(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>')
+_BUILD_ID_RE = re.compile(r'/_next/data/([a-zA-Z0-9_-]+)/')
+# Out-of-stock and in-stock keywords in one alternation: a single pass over the page classifies it
+_STOCK_KW_RE = re.compile(
+    r"(?P<oos>notify\s*me|out\s*of\s*stock|currently\s*unavailable|notify\s*when)"
+    r"|(?P<in>add\s*to\s*basket|add\s*to\s*cart|buy\s*now)",
+    re.I,
+)
+# Bytes variants for raw response bodies (requests mode): no decode and no lower() copy of the page
+_NEXT_DATA_RE_B = re.compile(_NEXT_DATA_RE.pattern.encode())
+_BUILD_ID_RE_B = re.compile(_BUILD_ID_RE.pattern.encode())
+_STOCK_KW_RE_B = re.compile(_STOCK_KW_RE.pattern.encode(), re.I)
+_ACCESS_DENIED_RE_B = re.compile(rb"access denied", re.I)
+_CURL_H_RE = re.compile(r'-H\s+["\']([^:]+):\s*([^"\']*)["\']')
+
+# -----------------------------------------------------------------------------
+# HTTP (keep-alive connection pool; one TLS handshake per host, not per call)
+# -----------------------------------------------------------------------------
+
+
+# One connection pool shared by every session (Telegram, each pincode's session, the session-file session):
+# sockets are reused across pincodes while cookies stay per session
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+)
+
+
+def _new_session(*header_sets: dict) -> requests.Session:
+    """New Session (own cookie jar) on the shared connection pool, with the given headers applied in order."""
+    s = requests.Session()
+    s.mount("https://", _ADAPTER)
+    for headers in header_sets:
+        s.headers.update(headers)
+    return s
+
+
+# Shared session for Telegram and other calls that don't need BigBasket location cookies
+_HTTP = _new_session()
+
+
+class TokenBucket:
+    """
+    Thread-safe rate limiter: up to burst requests back-to-back, then rate requests/sec on average.
+    take() sleeps only when the bucket is empty, so time spent on the network counts toward the budget.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(float(rate), 1e-6)
+        self.burst = max(float(burst), 1.0)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            # Reserve the token now; concurrent callers queue behind this one's wait
+            self.tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
@@ -57,27 +210,78 @@ API_HEADERS = {
 def load_json(path: Path, default):
     if path.exists():
         try:
-            with open(path, encoding="utf-8") as f:
-                return json.load(f)
+            return _json_loads(path.read_bytes())
         except Exception:
             pass
     return default
 
 
-def save_json(path: Path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def save_json(path: Path, data, indent: bool = True):
+    """Write JSON atomically (temp file + os.replace) so an interrupted write never truncates path.
+    indent=False writes compact JSON for files rewritten every run (state, session cache)."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        tmp.write_bytes(orjson.dumps(data, option=option))
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2 if indent else None, separators=None if indent else (",", ":"), ensure_ascii=False)
+    os.replace(tmp, path)
 
 
+@lru_cache(maxsize=1024)
 def parse_product_url(url: str):
-    """Return (product_id, slug) or (None, None)."""
-    m = re.search(r"bigbasket\.com/pd/(\d+)/([^/?]+)", url, re.I)
+    """Return (product_id, slug) or (None, None). Memoized: the same URLs are parsed every pincode and every loop."""
+    m = _PRODUCT_URL_RE.search(url)
     if m:
         return m.group(1), m.group(2).strip("/")
     return None, None
 
 
-def _send_telegram_to_chat(config: dict, chat_id: str | int, text: str) -> bool:
+@lru_cache(maxsize=1024)
+def _pretty_title(slug: str) -> str:
+    """Display title from a URL slug ("fresho-cauliflower-1-pc" -> "Fresho Cauliflower 1 Pc"), memoized per slug."""
+    return slug.replace("-", " ").title()
+
+
+@lru_cache(maxsize=16)
+def _tg_url(token: str, method: str) -> str:
+    """Bot API endpoint URL; built once per token/method for the whole run."""
+    return f"https://api.telegram.org/bot{token}/{method}"
+
+
+@lru_cache(maxsize=16)
+def _tg_base_data(chat_id: str, topic_id: str | int | float | None = None) -> tuple:
+    """Invariant form fields (chat_id, optional message_thread_id) as items; callers add text/caption."""
+    data = [("chat_id", chat_id)]
+    if topic_id is not None and str(topic_id).strip():
+        data.append(("message_thread_id", int(topic_id) if isinstance(topic_id, (int, float)) else int(str(topic_id).strip())))
+    return tuple(data)
+
+
+def _tg_token_chat(config: dict) -> tuple[str, str] | None:
+    """(telegram_bot_token, telegram_chat_id) as stripped strings, or None if either is missing. Never raises."""
+    token = str(config.get("telegram_bot_token") or "").strip()
+    chat_id_raw = config.get("telegram_chat_id")
+    chat_id = str(chat_id_raw).strip() if chat_id_raw is not None and str(chat_id_raw).strip() else ""
+    if not token or not chat_id:
+        return None
+    return token, chat_id
+
+
+def _tg_target(config: dict) -> tuple[str, tuple] | None:
+    """
+    (token, base form data) for telegram_chat_id and optional telegram_topic_id, or None if not configured.
+    Raises ValueError for a non-numeric telegram_topic_id: call it inside the send helpers' try.
+    """
+    token_chat = _tg_token_chat(config)
+    if not token_chat:
+        return None
+    token, chat_id = token_chat
+    return token, _tg_base_data(chat_id, config.get("telegram_topic_id"))
+
+
+def _send_telegram_to_chat_sync(config: dict, chat_id: str | int, text: str) -> bool:
     """Send a Telegram message to a specific chat_id. Uses telegram_bot_token from config. No topic. Returns True if sent."""
     if not config:
         return False
@@ -86,84 +290,112 @@ def _send_telegram_to_chat(config: dict, chat_id: str | int, text: str) -> bool:
     if not token or not cid:
         return False
     try:
-        data = {"chat_id": cid, "text": text}
-        r = requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            data=data,
-            timeout=15,
-        )
+        data = {**dict(_tg_base_data(cid)), "text": text}
+        r = _HTTP.post(_tg_url(token, "sendMessage"), data=data, timeout=15)
         if not r.ok:
-            print(f"  Telegram error {r.status_code}: {r.text}", file=sys.stderr)
+            log.warning(f"  Telegram error {r.status_code}: {r.text}")
             return False
         return True
     except Exception as e:
-        print(f"  (Telegram error: {e})", file=sys.stderr)
+        log.warning(f"  (Telegram error: {e})")
         return False
 
 
-def _send_telegram_photo(config: dict, photo_bytes: bytes, caption: str) -> bool:
-    """Send a Telegram photo with caption. Uses telegram_chat_id and optional topic_id. Returns True if sent."""
+def _send_telegram_photo_sync(config: dict, photo_bytes: bytes | str, caption: str) -> bool:
+    """
+    Send a Telegram photo with caption. Uses telegram_chat_id and optional topic_id. Returns True if sent.
+    photo_bytes may also be base64 text (as WebDriver returns it); it is decoded here, on the sending thread.
+    """
     if not config or not photo_bytes:
         return False
-    token = str(config.get("telegram_bot_token") or "").strip()
-    chat_id_raw = config.get("telegram_chat_id")
-    chat_id = str(chat_id_raw).strip() if chat_id_raw is not None and str(chat_id_raw).strip() else ""
-    if not token or not chat_id:
-        return False
     try:
-        files = {"photo": ("screenshot.png", photo_bytes, "image/png")}
-        data = {"chat_id": chat_id, "caption": caption[:1024]}
-        topic_id = config.get("telegram_topic_id")
-        if topic_id is not None and str(topic_id).strip():
-            data["message_thread_id"] = int(topic_id) if isinstance(topic_id, (int, float)) else int(str(topic_id).strip())
-        r = requests.post(
-            f"https://api.telegram.org/bot{token}/sendPhoto",
-            data=data,
-            files=files,
-            timeout=20,
-        )
+        if isinstance(photo_bytes, str):
+            photo_bytes = base64.b64decode(photo_bytes)
+        is_jpeg = photo_bytes[:2] == b"\xff\xd8"
+        target = _tg_target(config)
+        if not target:
+            return False
+        token, base = target
+        files = {"photo": ("screenshot.jpg", photo_bytes, "image/jpeg") if is_jpeg else ("screenshot.png", photo_bytes, "image/png")}
+        data = {**dict(base), "caption": caption[:1024]}
+        r = _HTTP.post(_tg_url(token, "sendPhoto"), data=data, files=files, timeout=20)
         if not r.ok:
-            print(f"  Telegram photo error {r.status_code}: {r.text[:150]}", file=sys.stderr)
+            log.warning(f"  Telegram photo error {r.status_code}: {r.text[:150]}")
             return False
-        print("  (Telegram photo sent)")
+        log.info("  (Telegram photo sent)")
         return True
     except Exception as e:
-        print(f"  (Telegram photo error: {e})", file=sys.stderr)
+        log.warning(f"  (Telegram photo error: {e})")
         return False
 
 
-def _send_telegram(config: dict, text: str, silent_if_missing: bool = False) -> bool:
+def _send_telegram_sync(config: dict, text: str, silent_if_missing: bool = False) -> bool:
     """Send a Telegram message. Config: telegram_bot_token, telegram_chat_id, telegram_topic_id (optional). Returns True if sent."""
     if not config:
         return False
-    token = str(config.get("telegram_bot_token") or "").strip()
-    chat_id_raw = config.get("telegram_chat_id")
-    chat_id = str(chat_id_raw).strip() if chat_id_raw is not None and str(chat_id_raw).strip() else ""
-    if not token or not chat_id:
-        if not silent_if_missing:
-            print("  (Telegram skipped: set telegram_bot_token and telegram_chat_id in config)", file=sys.stderr)
-        return False
     try:
+        target = _tg_target(config)
+        if not target:
+            if not silent_if_missing:
+                log.warning("  (Telegram skipped: set telegram_bot_token and telegram_chat_id in config)")
+            return False
+        token, base = target
         # Use form data (Telegram accepts both JSON and form)
-        data = {"chat_id": chat_id, "text": text}
-        topic_id = config.get("telegram_topic_id")
-        if topic_id is not None and str(topic_id).strip():
-            data["message_thread_id"] = int(topic_id) if isinstance(topic_id, (int, float)) else int(str(topic_id).strip())
-        r = requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            data=data,
-            timeout=15,
-        )
+        data = {**dict(base), "text": text}
+        r = _HTTP.post(_tg_url(token, "sendMessage"), data=data, timeout=15)
         if not r.ok:
-            print(f"  Telegram error {r.status_code}: {r.text}", file=sys.stderr)
+            log.warning(f"  Telegram error {r.status_code}: {r.text}")
             return False
-        print("  (Telegram sent)")
+        log.info("  (Telegram sent)")
         return True
     except Exception as e:
-        print(f"  (Telegram error: {e})", file=sys.stderr)
+        log.warning(f"  (Telegram error: {e})")
         return False
 
 
+# Telegram sends run in the background so checks don't block on the Bot API round trip
+_TG_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tg")
+_TG_PENDING: set[Future] = set()
+_TG_PENDING_LOCK = threading.Lock()
+
+
+def _tg_submit(fn, *args) -> Future:
+    """Submit a send to the Telegram pool and track it until done, so _wait_telegram can join it."""
+    fut = _TG_POOL.submit(fn, *args)
+    with _TG_PENDING_LOCK:
+        _TG_PENDING.add(fut)
+    fut.add_done_callback(_tg_done)
+    return fut
+
+
+def _tg_done(fut: Future) -> None:
+    with _TG_PENDING_LOCK:
+        _TG_PENDING.discard(fut)
+
+
+def _wait_telegram(timeout: float | None = 60) -> None:
+    """Block until the Telegram sends queued so far have finished (called at the end of each run)."""
+    with _TG_PENDING_LOCK:
+        pending = list(_TG_PENDING)
+    if pending:
+        wait(pending, timeout=timeout)
+
+
+def _send_telegram_to_chat(config: dict, chat_id: str | int, text: str) -> Future:
+    """Queue _send_telegram_to_chat_sync on the Telegram pool. Future resolves to True if sent."""
+    return _tg_submit(_send_telegram_to_chat_sync, config, chat_id, text)
+
+
+def _send_telegram_photo(config: dict, photo_bytes: bytes | str, caption: str) -> Future:
+    """Queue _send_telegram_photo_sync on the Telegram pool (bytes or base64 text). Future resolves to True if sent."""
+    return _tg_submit(_send_telegram_photo_sync, config, photo_bytes, caption)
+
+
+def _send_telegram(config: dict, text: str, silent_if_missing: bool = False) -> Future:
+    """Queue _send_telegram_sync on the Telegram pool. Future resolves to True if sent."""
+    return _tg_submit(_send_telegram_sync, config, text, silent_if_missing)
+
+
 def _send_telegram_error(config: dict, title: str, pincode: str, url: str, error_detail: str) -> None:
     """Send an error alert to telegram_error_chat_id (e.g. 7992845749)."""
     if not config:
@@ -181,18 +413,85 @@ def _send_telegram_error(config: dict, title: str, pincode: str, url: str, error
     _send_telegram_to_chat(config, chat_id, text)
 
 
-def _send_telegram_in_stock(config: dict, change: dict) -> None:
-    """Send a Telegram alert when a product is back in stock."""
-    if not config or (change.get("to") or "") != "in_stock":
-        return
-    title = change.get("title") or "Product"
-    pincode = change.get("pincode") or ""
-    url = (change.get("url") or "").strip()
-    text = f"BigBasket: {title} is back in stock"
-    if pincode:
-        text += f" @ pincode {pincode}"
-    text += "\n\nProduct link:\n" + url if url else "\n\n(No link)"
-    _send_telegram(config, text, silent_if_missing=False)
+def _in_stock_text(changes: list[dict]) -> str:
+    """Telegram text for one or more back-in-stock changes (one message per burst)."""
+    if len(changes) == 1:
+        c = changes[0]
+        url = (c.get("url") or "").strip()
+        text = f"BigBasket: {c.get('title') or 'Product'} is back in stock"
+        if c.get("pincode"):
+            text += f" @ pincode {c['pincode']}"
+        return text + ("\n\nProduct link:\n" + url if url else "\n\n(No link)")
+    lines = [f"BigBasket: {len(changes)} products back in stock"]
+    for c in changes:
+        line = f"• {c.get('title') or 'Product'}"
+        if c.get("pincode"):
+            line += f" @ pincode {c['pincode']}"
+        url = (c.get("url") or "").strip()
+        lines.append(line + (f"\n  {url}" if url else ""))
+    return "\n\n".join(lines)
+
+
+class _TelegramBatcher:
+    """
+    Collect back-in-stock changes and send them as one Telegram message per burst:
+    flushed every flush_interval seconds, or as soon as max_items are pending.
+    """
+
+    def __init__(self, flush_interval: float = 2.0, max_items: int = 20):
+        self.flush_interval = flush_interval
+        self.max_items = max_items
+        self._pending: list[tuple[dict, dict]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def enqueue(self, config: dict, change: dict) -> None:
+        if not config or (change.get("to") or "") != "in_stock":
+            return
+        with self._lock:
+            self._pending.append((config, change))
+            full = len(self._pending) >= self.max_items
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tg-batch", daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        groups: dict[int, tuple[dict, list[dict]]] = {}
+        for config, change in pending:
+            groups.setdefault(id(config), (config, []))[1].append(change)
+        for config, changes in groups.values():
+            _send_telegram_sync(config, _in_stock_text(changes), silent_if_missing=False)
+
+    def close(self) -> None:
+        """Stop the flush thread and send whatever is still pending; a later enqueue starts a new thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+        with self._lock:
+            self._thread = None
+            self._stop.clear()
+            self._wake.clear()
+        self.flush()
+
+
+_TG_BATCHER = _TelegramBatcher()
+
+
+def _is_bigbasket_entry(entry) -> bool:
+    return isinstance(entry, dict) and "bigbasket.com" in (entry.get("request") or {}).get("url", "")
 
 
 def _headers_from_har(har_data: dict) -> dict | None:
@@ -207,14 +506,36 @@ def _headers_from_har(har_data: dict) -> dict | None:
     if not isinstance(entries, list):
         return None
     # Collect all requests to bigbasket.com; take the last one (most recent cookies)
-    bigbasket_entries = [
-        e for e in entries
-        if isinstance(e, dict)
-        and "bigbasket.com" in (e.get("request") or {}).get("url", "")
-    ]
+    bigbasket_entries = [e for e in entries if _is_bigbasket_entry(e)]
     if not bigbasket_entries:
         return None
-    req = bigbasket_entries[-1].get("request") or {}
+    return _headers_from_har_entry(bigbasket_entries[-1])
+
+
+def _headers_from_har_streamed(path: Path) -> dict | None:
+    """
+    Stream log.entries with ijson, keeping only the last bigbasket.com entry, so a large HAR
+    is never held in memory whole. Returns None if ijson is missing or the file is not a usable HAR.
+    """
+    if ijson is None:
+        return None
+    last = None
+    try:
+        with path.open("rb") as f:
+            if f.read(64).lstrip()[:1] != b"{":
+                return None
+            f.seek(0)
+            for entry in ijson.items(f, "log.entries.item"):
+                if _is_bigbasket_entry(entry):
+                    last = entry
+    except Exception:
+        return None
+    return _headers_from_har_entry(last) if last is not None else None
+
+
+def _headers_from_har_entry(entry: dict) -> dict | None:
+    """Build a header dict from one HAR entry's request headers and cookies. Returns None if empty."""
+    req = entry.get("request") or {}
     har_headers = req.get("headers") or []
     if not isinstance(har_headers, list):
         return None
@@ -251,6 +572,9 @@ def load_session_from_file(path: str | Path) -> dict | None:
     path = Path(path)
     if not path.exists():
         return None
+    headers = _headers_from_har_streamed(path)
+    if headers:
+        return headers
     try:
         raw = path.read_text(encoding="utf-8", errors="ignore").strip()
     except Exception:
@@ -261,7 +585,7 @@ def load_session_from_file(path: str | Path) -> dict | None:
     # 1. Try HAR (JSON with log.entries)
     if raw.lstrip().startswith("{"):
         try:
-            data = json.loads(raw)
+            data = _json_loads(raw)
             if isinstance(data, dict) and "log" in data and "entries" in (data.get("log") or {}):
                 headers = _headers_from_har(data)
                 if headers:
@@ -274,7 +598,7 @@ def load_session_from_file(path: str | Path) -> dict | None:
         # Normalize Windows cURL (^" and ^\^" from "Copy as cURL" in Chrome on Windows)
         raw = raw.replace('^"', '"').replace('^\\^"', '"')
         # Parse curl: -H "Key: value" or -H 'Key: value'
-        for m in re.finditer(r'-H\s+["\']([^:]+):\s*([^"\']*)["\']', raw):
+        for m in _CURL_H_RE.finditer(raw):
             key, val = m.group(1).strip(), m.group(2).strip()
             if key:
                 headers[key] = val
@@ -292,49 +616,107 @@ def load_session_from_file(path: str | Path) -> dict | None:
     return headers if headers else None
 
 
+# Pincode -> (lat, lng) from places autocomplete/details; effectively static, so kept for LATLNG_TTL seconds
+# (in-process across --loop runs, and in session_cache.json across restarts). Cookie expiry then only costs
+# the serviceable call.
+LATLNG_TTL = 24 * 3600
+_LATLNG_CACHE: dict[str, tuple[float, tuple]] = {}
+
+
+# Places API shapes: autocomplete is {"predictions": [{"place_id": ...}, ...]} (older: "results"/"places",
+# "id"/"placeId", or a bare list); details has top-level lat/lng, else geometry.location (Google style)
+_PLACE_LIST_KEYS = ("predictions", "results", "places")
+_PLACE_ID_KEYS = ("place_id", "id", "placeId")
+
+
+def _first_place_id(data) -> str | None:
+    """place id of the first autocomplete result, or None."""
+    if isinstance(data, dict):
+        data = next((data[k] for k in _PLACE_LIST_KEYS if data.get(k)), None)
+    if not isinstance(data, list) or not data or not isinstance(data[0], dict):
+        return None
+    return next((data[0][k] for k in _PLACE_ID_KEYS if data[0].get(k)), None)
+
+
+def _details_latlng(details) -> tuple | None:
+    """(lat, lng) from a place details response, or None."""
+    if not isinstance(details, dict):
+        return None
+    lat = details.get("lat") or details.get("latitude")
+    lng = details.get("lng") or details.get("longitude")
+    if lat is None or lng is None:
+        loc = (details.get("geometry") or {}).get("location") or {}
+        lat = lat or loc.get("lat")
+        lng = lng or loc.get("lng")
+    if lat is None or lng is None:
+        return None
+    return lat, lng
+
+
+def _lookup_latlng(s: requests.Session, pin: str) -> tuple | None:
+    """places autocomplete -> details. Returns (lat, lng) or None."""
+    # 1. Autocomplete
+    r1 = s.get(
+        "https://www.bigbasket.com/places/v1/places/autocomplete/",
+        params={"inputText": pin, "token": token_hex(16)},
+        timeout=10,
+    )
+    if not r1.ok:
+        return None
+    place_id = _first_place_id(_json(r1))
+    if not place_id:
+        return None
+
+    # 2. Details
+    r2 = s.get(
+        "https://www.bigbasket.com/places/v1/places/details/",
+        params={"placeId": place_id, "token": token_hex(16)},
+        timeout=10,
+    )
+    if not r2.ok:
+        return None
+    return _details_latlng(_json(r2))
+
+
+def get_latlng(pincode: str, s: requests.Session) -> tuple | None:
+    """(lat, lng) for pincode from the TTL cache, else looked up with session s (and cached)."""
+    now = time.time()
+    hit = _LATLNG_CACHE.get(pincode)
+    if hit and now - hit[0] < LATLNG_TTL:
+        return hit[1]
+    latlng = _lookup_latlng(s, pincode)
+    if latlng:
+        _LATLNG_CACHE[pincode] = (now, latlng)
+    return latlng
+
+
+def _restore_latlng(cache: dict) -> None:
+    for pin, entry in (cache.get("latlng") or {}).items():
+        if isinstance(entry, dict) and entry.get("value") and pin not in _LATLNG_CACHE:
+            _LATLNG_CACHE[pin] = (float(entry.get("ts") or 0), tuple(entry["value"]))
+
+
+def _persist_latlng(cache: dict) -> None:
+    now = time.time()
+    cache["latlng"] = {
+        pin: {"value": list(latlng), "ts": ts}
+        for pin, (ts, latlng) in _LATLNG_CACHE.items()
+        if now - ts < LATLNG_TTL
+    }
+
+
 def set_pincode_session(pincode: str) -> requests.Session | None:
     """
     Use BigBasket's API to set delivery location; return session with cookies.
-    autocomplete -> details -> serviceable.
+    autocomplete -> details (skipped while the pincode's lat/lng is cached) -> serviceable.
     """
-    s = requests.Session()
-    s.headers.update(API_HEADERS)
+    s = _new_session(API_HEADERS)
     pin = pincode.strip()
     try:
-        # 1. Autocomplete
-        r1 = s.get(
-            "https://www.bigbasket.com/places/v1/places/autocomplete/",
-            params={"inputText": pin, "token": uuid.uuid4().hex[:32]},
-            timeout=10,
-        )
-        if not r1.ok:
-            return None
-        data = r1.json()
-        preds = data.get("predictions") or data.get("results") or data.get("places") or []
-        if not preds:
-            return None
-        first = preds[0] if isinstance(preds[0], dict) else preds
-        place_id = first.get("place_id") or first.get("id") or first.get("placeId")
-        if not place_id:
-            return None
-
-        # 2. Details
-        r2 = s.get(
-            "https://www.bigbasket.com/places/v1/places/details/",
-            params={"placeId": place_id, "token": uuid.uuid4().hex[:32]},
-            timeout=10,
-        )
-        if not r2.ok:
-            return None
-        details = r2.json()
-        lat = details.get("lat") or details.get("latitude")
-        lng = details.get("lng") or details.get("longitude")
-        if lat is None or lng is None:
-            loc = details.get("geometry", {}).get("location", details)
-            lat = lat or loc.get("lat")
-            lng = lng or loc.get("lng")
-        if lat is None or lng is None:
+        latlng = get_latlng(pin, s)
+        if not latlng:
             return None
+        lat, lng = latlng
 
         # 3. Serviceable (sets location cookies)
         r3 = s.get(
@@ -345,48 +727,123 @@ def set_pincode_session(pincode: str) -> requests.Session | None:
         if not r3.ok:
             return None
         return s
-    except requests.RequestException:
+    except (requests.RequestException, ValueError):
         return None
 
 
-def fetch_product_page(url: str, session: requests.Session) -> str | None:
-    """Fetch product page HTML. Returns None on failure or Access Denied."""
-    try:
-        r = session.get(url, headers=HEADERS, timeout=15)
-        if not r.ok:
+# Pincode-session cookies and the buildId persisted across runs (session_cache.json):
+# {"build_id": {"value": str, "ts": epoch}, "pincodes": {pin: {"cookies": {...}, "ts": epoch, "expires": epoch|null}},
+#  "latlng": {pin: {"value": [lat, lng], "ts": epoch}}}
+SESSION_CACHE_TTL = 30 * 60
+
+
+# Location cookies set by serviceable; while they are unexpired the cached session is reused past
+# SESSION_CACHE_TTL (which still applies when the site sends them without an expiry)
+_LOCATION_COOKIES = ("_bb_pin_code", "_bb_lat_long", "_bb_addressinfo")
+_COOKIE_EXPIRY_MARGIN = 5 * 60
+
+
+def _location_cookie_expiry(jar) -> float | None:
+    """Earliest expiry (epoch) among the location cookies in jar, or None if none of them has one."""
+    expiries = [c.expires for c in jar if c.name in _LOCATION_COOKIES and c.expires]
+    return float(min(expiries)) if expiries else None
+
+
+def _load_cached_session(cache: dict, pincode: str) -> requests.Session | None:
+    """
+    Rebuild a pincode session from cached cookies if its location cookies are still unexpired,
+    or (no expiry known) if younger than SESSION_CACHE_TTL.
+    """
+    entry = (cache.get("pincodes") or {}).get(pincode)
+    if not isinstance(entry, dict) or not entry.get("cookies"):
+        return None
+    now = time.time()
+    expires = entry.get("expires")
+    if expires:
+        if now >= float(expires) - _COOKIE_EXPIRY_MARGIN:
             return None
-        text = r.text
-        if "Access Denied" in text or "access denied" in text.lower():
+    elif now - float(entry.get("ts") or 0) >= SESSION_CACHE_TTL:
+        return None
+    s = _new_session(API_HEADERS)
+    s.cookies.update(entry["cookies"])
+    return s
+
+
+def _store_cached_session(cache: dict, pincode: str, session: requests.Session) -> None:
+    cache.setdefault("pincodes", {})[pincode] = {
+        "cookies": requests.utils.dict_from_cookiejar(session.cookies),
+        "ts": time.time(),
+        "expires": _location_cookie_expiry(session.cookies),
+    }
+
+
+def fetch_product_page(url: str, session: requests.Session, enough=None) -> bytes | None:
+    """
+    Fetch product page HTML as raw bytes. Returns None on failure or Access Denied.
+    The body is streamed and reading stops once the __NEXT_DATA__ script has closed (it sits near the top of
+    the page), so the rest of the HTML is never downloaded. If enough is given, it is called with that prefix
+    and reading carries on to the end of the same response when it returns False.
+    """
+    try:
+        r = session.get(url, headers=HEADERS, timeout=15, stream=True)
+        try:
+            if not r.ok:
+                return None
+            buf = bytearray()
+            start = -1
+            read_all = False
+            for chunk in r.iter_content(65536):
+                scan_from = max(0, len(buf) - 32)
+                buf.extend(chunk)
+                if read_all:
+                    continue
+                if start == -1:
+                    start = buf.find(b'id="__NEXT_DATA__"', scan_from)
+                if start != -1 and buf.find(b"</script>", max(start, scan_from)) != -1:
+                    if enough is None or enough(buf):
+                        break
+                    read_all = True
+            body = bytes(buf)
+        finally:
+            r.close()
+        if _ACCESS_DENIED_RE_B.search(body):
             return None
-        return text
+        return body
     except requests.RequestException:
         return None
 
 
-def _find_stock_in_obj(obj, depth: int = 0) -> tuple[str | None, str | None]:
-    """Recurse through dict for store_availability / pstat. Returns (status, title) or (None, None)."""
-    if depth > 10 or not isinstance(obj, dict):
+_AVAIL_KEYS = ("store_availability", "storeAvailability", "availability")
+_TITLE_KEYS = ("p_desc", "product_name", "title")
+_PRODUCT_CONTAINER_KEYS = ("productDetails", "product", "productInfo")
+
+
+def _find_stock_in_obj(obj) -> tuple[str | None, str | None]:
+    """
+    Walk dicts (and dicts directly inside lists) for store_availability / pstat, at most 10 levels below obj.
+    Iterative, in the same depth-first order as a recursive walk. Returns (status, title) or (None, None).
+    """
+    if not isinstance(obj, dict):
         return None, None
-    av = obj.get("store_availability") or obj.get("storeAvailability") or obj.get("availability")
-    if isinstance(av, list) and av:
-        pstats = [x.get("pstat") for x in av if isinstance(x, dict)]
-        if any(p == "A" for p in pstats):
-            t = (obj.get("p_desc") or obj.get("product_name") or obj.get("title") or "").strip()
-            return "in_stock", t or None
-        if all(p == "O" for p in pstats):
-            t = (obj.get("p_desc") or obj.get("product_name") or obj.get("title") or "").strip()
-            return "out_of_stock", t or None
-    for v in obj.values():
-        if isinstance(v, dict):
-            s, t = _find_stock_in_obj(v, depth + 1)
-            if s:
-                return s, t
-        if isinstance(v, list):
-            for item in v:
-                if isinstance(item, dict):
-                    s, t = _find_stock_in_obj(item, depth + 1)
-                    if s:
-                        return s, t
+    stack = deque([(obj, 0)])
+    while stack:
+        cur, depth = stack.pop()
+        av = next((cur[k] for k in _AVAIL_KEYS if cur.get(k)), None)
+        if isinstance(av, list) and av:
+            pstats = [x.get("pstat") for x in av if isinstance(x, dict)]
+            status = "in_stock" if "A" in pstats else "out_of_stock" if all(p == "O" for p in pstats) else None
+            if status:
+                t = (next((cur[k] for k in _TITLE_KEYS if cur.get(k)), None) or "").strip()
+                return status, t or None
+        if depth >= 10:
+            continue
+        children = []
+        for v in cur.values():
+            if isinstance(v, dict):
+                children.append(v)
+            elif isinstance(v, list):
+                children.extend(x for x in v if isinstance(x, dict))
+        stack.extend((c, depth + 1) for c in reversed(children))
     return None, None
 
 
@@ -397,59 +854,75 @@ def parse_stock_from_page_props(props: dict) -> tuple[str, str | None]:
     """
     if not isinstance(props, dict):
         return "unknown", None
+    # Fast path: availability sits directly on the product container; only walk the whole tree if not
+    for key in _PRODUCT_CONTAINER_KEYS:
+        container = props.get(key)
+        if isinstance(container, dict) and any(isinstance(container.get(k), list) for k in _AVAIL_KEYS):
+            status, title = _find_stock_in_obj({k: container[k] for k in (*_AVAIL_KEYS, *_TITLE_KEYS) if k in container})
+            if status:
+                return status, title
     status, title = _find_stock_in_obj(props)
     if status:
         return status, title
     return "unknown", None
 
 
-def get_build_id_from_html(html: str) -> str | None:
-    """Extract Next.js buildId from page HTML (__NEXT_DATA__ or _next/data/...)."""
+def get_build_id_from_html(html: str | bytes) -> str | None:
+    """Extract Next.js buildId from page HTML (__NEXT_DATA__ or _next/data/...). Accepts str or raw bytes."""
     if not html:
         return None
-    m = re.search(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>', html)
+    is_bytes = isinstance(html, (bytes, bytearray))
+    m = (_NEXT_DATA_RE_B if is_bytes else _NEXT_DATA_RE).search(html)
     if m:
         try:
-            data = json.loads(m.group(1))
+            data = _json_loads(m.group(1))
             bid = data.get("buildId")
             if bid:
                 return bid
-        except (json.JSONDecodeError, TypeError):
+        except (json.JSONDecodeError, TypeError, AttributeError):
             pass
-    m = re.search(r'/_next/data/([a-zA-Z0-9_-]+)/', html)
+    m = (_BUILD_ID_RE_B if is_bytes else _BUILD_ID_RE).search(html)
     if m:
-        return m.group(1)
+        bid = m.group(1)
+        return bid.decode("ascii") if is_bytes else bid
     return None
 
 
-def parse_stock_from_html(html: str) -> tuple[str, str | None]:
+def parse_stock_from_html(html: str | bytes, keywords: bool = True) -> tuple[str, str | None]:
     """
-    Parse stock from product page HTML.
+    Parse stock from product page HTML (str from the browser, or raw response bytes).
     Returns (status, title) where status is in_stock | out_of_stock | unknown.
+    keywords=False skips the text fallback (for a truncated page, where only __NEXT_DATA__ can be trusted).
     """
     if not html or len(html) < 500:
         return "unknown", None
+    if isinstance(html, (bytes, bytearray)):
+        next_data_re, stock_kw_re = _NEXT_DATA_RE_B, _STOCK_KW_RE_B
+    else:
+        next_data_re, stock_kw_re = _NEXT_DATA_RE, _STOCK_KW_RE
 
     # 1. __NEXT_DATA__
-    m = re.search(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>', html)
+    m = next_data_re.search(html)
     if m:
         try:
-            data = json.loads(m.group(1))
+            data = _json_loads(m.group(1))
             props = data.get("props", {}).get("pageProps", {})
             if isinstance(props, dict):
-                status, title = _find_stock_in_obj(props)
-                if status:
+                status, title = parse_stock_from_page_props(props)
+                if status != "unknown":
                     return status, title
-        except (json.JSONDecodeError, KeyError):
+        except (json.JSONDecodeError, KeyError, AttributeError):
             pass
 
-    # 2. Text fallback
-    low = html.lower()
-    if re.search(r"notify\s*me|out\s*of\s*stock|currently\s*unavailable|notify\s*when", low):
-        return "out_of_stock", None
-    if re.search(r"add\s*to\s*basket|add\s*to\s*cart|buy\s*now", low):
-        return "in_stock", None
-    return "unknown", None
+    # 2. Text fallback: one case-insensitive scan; any out-of-stock keyword wins over in-stock ones
+    if not keywords:
+        return "unknown", None
+    seen_in = False
+    for m in stock_kw_re.finditer(html):
+        if m.lastgroup == "oos":
+            return "out_of_stock", None
+        seen_in = True
+    return ("in_stock" if seen_in else "unknown"), None
 
 
 def check_one_via_api_in_browser(driver, pid: str, slug: str, build_id: str) -> tuple[str | None, str | None]:
@@ -463,7 +936,7 @@ def check_one_via_api_in_browser(driver, pid: str, slug: str, build_id: str) ->
     var buildId = arguments[0], pid = arguments[1], slug = arguments[2], callback = arguments[3];
     var url = 'https://www.bigbasket.com/_next/data/' + buildId + '/pd/' + pid + '/' + slug + '.json';
     fetch(url, { credentials: 'include' })
-    .then(function(r) { if (!r.ok) throw new Error(r.status); return r.json(); })
+    .then(function(r) { if (r.status === 404) return { _status: 404 }; if (!r.ok) throw new Error(r.status); return r.json(); })
     .then(function(data) { callback(data); })
     .catch(function() { callback(null); });
     """
@@ -471,6 +944,11 @@ def check_one_via_api_in_browser(driver, pid: str, slug: str, build_id: str) ->
         data = driver.execute_async_script(js, build_id, pid, slug)
         if not data or not isinstance(data, dict):
             return None, None
+        if data.get("_status") == 404:
+            # Site redeployed: forget the buildId so the next page load supplies a fresh one
+            if build_id == _BUILD_ID:
+                _remember_build_id(None)
+            return None, None
         props = data.get("pageProps", data)
         if not isinstance(props, dict):
             return None, None
@@ -480,29 +958,113 @@ def check_one_via_api_in_browser(driver, pid: str, slug: str, build_id: str) ->
         return None, None
 
 
-def check_one(url: str, pincode: str, session: requests.Session) -> dict:
+# Next.js buildId for the _next/data JSON endpoint: learned from the first product page HTML,
+# dropped on 404 (site redeployed) or after BUILD_ID_TTL seconds.
+BUILD_ID_TTL = 6 * 3600
+_BUILD_ID: str | None = None
+_BUILD_ID_TS = 0.0
+
+
+def _cached_build_id() -> str | None:
+    if _BUILD_ID and time.time() - _BUILD_ID_TS < BUILD_ID_TTL:
+        return _BUILD_ID
+    return None
+
+
+def _remember_build_id(build_id: str | None, ts: float | None = None) -> None:
+    global _BUILD_ID, _BUILD_ID_TS
+    _BUILD_ID = build_id
+    _BUILD_ID_TS = (ts or time.time()) if build_id else 0.0
+
+
+def _restore_build_id(cache: dict) -> None:
+    """Adopt the buildId saved in session_cache.json (if still within BUILD_ID_TTL) unless one is already known."""
+    cached_bid = cache.get("build_id") or {}
+    if not _cached_build_id() and cached_bid.get("value"):
+        _remember_build_id(cached_bid["value"], float(cached_bid.get("ts") or 0))
+
+
+def _persist_build_id(cache: dict) -> None:
+    """Write the current buildId into cache (dropping a stale one) before session_cache.json is saved."""
+    if _cached_build_id():
+        cache["build_id"] = {"value": _BUILD_ID, "ts": _BUILD_ID_TS}
+    else:
+        cache.pop("build_id", None)
+
+
+def fetch_product_props(pid: str, slug: str, build_id: str, session: requests.Session) -> dict | None:
+    """
+    Fetch pageProps from /_next/data/{buildId}/pd/{pid}/{slug}.json (much smaller than the HTML page).
+    Returns None on failure; a 404 means the buildId is stale and it is forgotten.
+    """
+    try:
+        r = session.get(
+            f"https://www.bigbasket.com/_next/data/{build_id}/pd/{pid}/{slug}.json",
+            headers={**HEADERS, "Accept": "application/json", "x-nextjs-data": "1"},
+            timeout=15,
+        )
+        if r.status_code == 404:
+            _remember_build_id(None)
+            return None
+        if not r.ok:
+            return None
+        data = _json(r)
+    except (requests.RequestException, ValueError):
+        return None
+    props = data.get("pageProps", data) if isinstance(data, dict) else None
+    return props if isinstance(props, dict) else None
+
+
+@dataclass(slots=True)
+class CheckResult:
+    """Outcome of one product × pincode check (slotted: no per-instance dict)."""
+    url: str
+    product_id: str | None
+    slug: str | None
+    title: str | None
+    status: str
+    error: str | None = None
+
+
+def check_one(url: str, pincode: str, session: requests.Session) -> CheckResult:
     """
-    Check one product for one pincode. Returns dict with url, product_id, slug, title, status, error.
+    Check one product for one pincode. Returns a CheckResult (url, product_id, slug, title, status, error).
+    Uses the _next/data JSON endpoint once a buildId is known; falls back to the product page HTML.
     """
     pid, slug = parse_product_url(url)
     if not pid or not slug:
-        return {"url": url, "product_id": None, "slug": None, "title": None, "status": "error", "error": "Invalid URL"}
-
-    html = fetch_product_page(url, session)
+        return CheckResult(url, None, None, None, "error", "Invalid URL")
+
+    build_id = _cached_build_id()
+    if build_id:
+        props = fetch_product_props(pid, slug, build_id, session)
+        if props is not None:
+            status, title = parse_stock_from_page_props(props)
+            if status != "unknown":
+                return CheckResult(url, pid, slug, title or _pretty_title(slug), status)
+
+    # Stop the stream after __NEXT_DATA__ only if its JSON settles the status; otherwise the same response is
+    # read to the end, so the keyword fallback never runs on a prefix (it could miss a later out-of-stock marker)
+    prefix = None
+
+    def enough(buf: bytearray) -> bool:
+        nonlocal prefix
+        prefix = parse_stock_from_html(buf, keywords=False)
+        return prefix[0] != "unknown"
+
+    html = fetch_product_page(url, session, enough=enough)
     if not html:
-        return {
-            "url": url,
-            "product_id": pid,
-            "slug": slug,
-            "title": slug.replace("-", " ").title(),
-            "status": "error",
-            "error": "Failed to fetch or Access Denied",
-        }
-
-    status, title = parse_stock_from_html(html)
+        return CheckResult(url, pid, slug, _pretty_title(slug), "error", "Failed to fetch or Access Denied")
+
+    if not _cached_build_id():
+        _remember_build_id(get_build_id_from_html(html))
+    if prefix is not None and prefix[0] != "unknown":
+        status, title = prefix
+    else:
+        status, title = parse_stock_from_html(html)
     if not title:
-        title = slug.replace("-", " ").title()
-    return {"url": url, "product_id": pid, "slug": slug, "title": title, "status": status, "error": None}
+        title = _pretty_title(slug)
+    return CheckResult(url, pid, slug, title, status)
 
 
 # -----------------------------------------------------------------------------
@@ -510,18 +1072,22 @@ def check_one(url: str, pincode: str, session: requests.Session) -> dict:
 # -----------------------------------------------------------------------------
 
 
-def _get_driver(headless: bool = False):
-    """Create Chrome WebDriver using webdriver-manager. Returns driver or None."""
+def _get_driver(headless: bool = False, page_load_strategy: str = "normal"):
+    """
+    Create Chrome WebDriver using webdriver-manager. Returns driver or None.
+    page_load_strategy "eager" makes driver.get() return at DOMContentLoaded instead of after every image/font/tracker.
+    """
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
         from selenium.webdriver.chrome.service import Service
         from webdriver_manager.chrome import ChromeDriverManager
     except ImportError as e:
-        print("Browser mode needs: pip install selenium webdriver-manager", file=sys.stderr)
+        log.warning("Browser mode needs: pip install selenium webdriver-manager")
         return None
     try:
         opts = Options()
+        opts.page_load_strategy = page_load_strategy
         if headless:
             opts.add_argument("--headless=new")
             opts.add_argument("--disable-gpu")
@@ -536,11 +1102,12 @@ def _get_driver(headless: bool = False):
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         return driver
     except Exception as e:
-        print(f"Could not start Chrome: {e}", file=sys.stderr)
+        log.warning(f"Could not start Chrome: {e}")
         return None
 
 
 # JS to record clicks and inputs in main doc AND all same-origin iframes; builds window.top._bbRecordedSteps
+# and, when the _bbPush CDP binding exists, pushes each step to Python as it happens
 _RECORD_PINCODE_JS = """
 (function() {
   var top = window.top;
@@ -569,23 +1136,25 @@ _RECORD_PINCODE_JS = """
   function addListeners(doc) {
     if (!doc || doc._bbRecorderInjected) return;
     doc._bbRecorderInjected = true;
-    function saveSteps() {
+    function saveStep(step) {
+      top._bbRecordedSteps.push(step);
       try { top.sessionStorage.setItem('_bbRecordedSteps', JSON.stringify(top._bbRecordedSteps)); } catch (e) {}
+      try { if (typeof top._bbPush === 'function') top._bbPush(JSON.stringify(step)); } catch (e) {}
     }
     doc.addEventListener('click', function(e) {
       var s = getSelector(e.target);
-      if (s) { top._bbRecordedSteps.push({ action: 'click', by: s.by, value: s.value }); saveSteps(); }
+      if (s) saveStep({ action: 'click', by: s.by, value: s.value });
     }, true);
     doc.addEventListener('input', function(e) {
       var s = getSelector(e.target);
       if (s && (e.target.tagName === 'INPUT' || e.target.tagName === 'TEXTAREA')) {
-        top._bbRecordedSteps.push({ action: 'send_keys', by: s.by, value: s.value, inputValue: '<PIN>' }); saveSteps();
+        saveStep({ action: 'send_keys', by: s.by, value: s.value, inputValue: '<PIN>' });
       }
     }, true);
     doc.addEventListener('keydown', function(e) {
       if (e.key === 'Enter') {
         var s = getSelector(e.target);
-        if (s) { top._bbRecordedSteps.push({ action: 'send_keys', by: s.by, value: s.value, inputValue: '<PIN>', key: 'Enter' }); saveSteps(); }
+        if (s) saveStep({ action: 'send_keys', by: s.by, value: s.value, inputValue: '<PIN>', key: 'Enter' });
       }
     }, true);
   }
@@ -603,27 +1172,93 @@ _RECORD_PINCODE_JS = """
 """
 
 
+def cdp_listen(driver, setup, event_types, on_event, ready_timeout: float = 15):
+    """
+    Receive CDP events pushed by Chrome over Selenium's own DevTools channel (driver.bidi_connection(),
+    trio is a Selenium 4 dependency), on a background thread.
+    setup(session, devtools) is awaited first (enable domains, add bindings); event_types(devtools) returns the
+    event classes to listen for; on_event(event) runs on the listener thread for each one.
+    Returns a stop() callable, or None if the channel could not be opened (no Chrome DevTools, no trio).
+    """
+    try:
+        import trio
+    except ImportError:
+        return None
+    ready = threading.Event()
+    state = {}
+
+    async def listen():
+        try:
+            async with driver.bidi_connection() as conn:
+                await setup(conn.session, conn.devtools)
+                with trio.CancelScope() as scope:
+                    state["scope"], state["token"] = scope, trio.lowlevel.current_trio_token()
+                    ready.set()
+                    async for event in conn.session.listen(*event_types(conn.devtools), buffer_size=256):
+                        on_event(event)
+        except Exception as e:
+            state["error"] = e
+        finally:
+            ready.set()
+
+    thread = threading.Thread(target=trio.run, args=(listen,), daemon=True)
+    thread.start()
+    if not ready.wait(ready_timeout) or "scope" not in state or "error" in state:
+        return None
+
+    def stop() -> None:
+        try:
+            trio.from_thread.run_sync(state["scope"].cancel, trio_token=state["token"])
+        except Exception:
+            pass  # listener already gone (browser closed)
+        thread.join(timeout=5)
+
+    return stop
+
+
+def _start_step_binding(driver, steps: list):
+    """
+    Expose window._bbPush via CDP Runtime.addBinding so the recorder pushes each step to Python
+    (Runtime.bindingCalled) instead of being polled. Returns stop() for the listener, or None if CDP is unavailable.
+    """
+    async def setup(session, devtools):
+        await session.execute(devtools.runtime.enable())
+        await session.execute(devtools.runtime.add_binding(name="_bbPush"))
+
+    def on_binding(event):
+        if event.name != "_bbPush":
+            return
+        try:
+            steps.append(_json_loads(event.payload or "{}"))
+        except ValueError:
+            return
+        log.info(f"  Recorded {len(steps)} steps so far...")
+
+    return cdp_listen(driver, setup, lambda devtools: (devtools.runtime.BindingCalled,), on_binding)
+
+
 def _record_pincode_flow(driver) -> bool:
     """
     Record user's pincode flow: inject recorder (main doc + all iframes), user does flow, press Enter to save.
     Saves to pincode_flow.json. Returns True if steps were saved.
     """
-    import threading
+    _setup_log_output()
     try:
         from selenium.webdriver.common.by import By
     except ImportError:
         pass
-    print("Opening BigBasket... Do your pincode flow: click location, type pincode, select area.")
-    print("When done, press Enter HERE (in this terminal) to save the steps.")
+    log.info("Opening BigBasket... Do your pincode flow: click location, type pincode, select area.")
+    log.info("When done, press Enter HERE (in this terminal) to save the steps.")
     driver.get("https://www.bigbasket.com/")
     driver.maximize_window()
     time.sleep(5)
+    done = threading.Event()
+    latest_steps = []
+    stop_push = _start_step_binding(driver, latest_steps)
     try:
         driver.execute_script(_RECORD_PINCODE_JS)
     except Exception as e:
-        print(f"Recorder inject failed: {e}", file=sys.stderr)
-    done = threading.Event()
-    latest_steps = []
+        log.warning(f"Recorder inject failed: {e}")
 
     def live_count():
         while not done.is_set():
@@ -637,18 +1272,21 @@ def _record_pincode_flow(driver) -> bool:
                     "return JSON.stringify(arr);"
                 )
                 if raw:
-                    latest_steps[:] = json.loads(raw)
+                    latest_steps[:] = _json_loads(raw)
                     n = len(latest_steps)
                     if n > 0:
-                        print(f"  Recorded {n} steps so far...")
+                        log.info(f"  Recorded {n} steps so far...")
             except Exception:
                 pass
-    t = threading.Thread(target=live_count, daemon=True)
-    t.start()
+    if stop_push is None:
+        # No CDP event channel on this driver: poll the recorded steps instead
+        threading.Thread(target=live_count, daemon=True).start()
     try:
         input()
     finally:
         done.set()
+        if stop_push is not None:
+            stop_push()
     steps = list(latest_steps) if latest_steps else []
     if not steps:
         try:
@@ -658,12 +1296,12 @@ def _record_pincode_flow(driver) -> bool:
                 "return JSON.stringify(arr);"
             )
             if raw:
-                steps = json.loads(raw) if isinstance(raw, str) else (raw or [])
+                steps = _json_loads(raw) if isinstance(raw, str) else (raw or [])
         except Exception:
             pass
     if not steps:
-        print("No steps recorded.", file=sys.stderr)
-        print("Tip: The location widget may be in an iframe; we inject into all frames. Try clicking once on the page first, then open location and type pincode.", file=sys.stderr)
+        log.warning("No steps recorded.")
+        log.warning("Tip: The location widget may be in an iframe; we inject into all frames. Try clicking once on the page first, then open location and type pincode.")
         return False
     # Dedupe: merge consecutive send_keys with same selector; keep selector (by, value) and inputValue
     steps_deduped = []
@@ -674,7 +1312,7 @@ def _record_pincode_flow(driver) -> bool:
                 continue
         steps_deduped.append(s)
     save_json(PINCODE_FLOW_FILE, {"steps": steps_deduped})
-    print(f"Saved {len(steps_deduped)} steps to pincode_flow.json. Future runs will use this to set pincode.")
+    log.info(f"Saved {len(steps_deduped)} steps to pincode_flow.json. Future runs will use this to set pincode.")
     return True
 
 
@@ -708,6 +1346,71 @@ def _find_element_any_frame(driver, by, value):
     return None, -1
 
 
+# Returns [index, element] for the first xpath (in order) whose first match is rendered, else null
+_FIRST_VISIBLE_XPATH_JS = """
+var xs = arguments[0];
+for (var i = 0; i < xs.length; i++) {
+  try {
+    var r = document.evaluate(xs[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (r && r.getClientRects().length) return [i, r];
+  } catch (e) {}
+}
+return null;
+"""
+
+
+def _find_first_in_current_frame(driver, xpaths) -> tuple[int, object] | None:
+    """Try all xpaths in the current frame with one execute_script. Returns (xpath_index, element) or None."""
+    try:
+        hit = driver.execute_script(_FIRST_VISIBLE_XPATH_JS, list(xpaths))
+    except Exception:
+        return None
+    return (int(hit[0]), hit[1]) if hit else None
+
+
+def _find_first_any_frame(driver, xpaths):
+    """
+    Find the first visible match for xpaths (earlier xpaths win) in the main document or any same-origin iframe:
+    one script per frame instead of one find per xpath per frame. Leaves the driver in the winning frame.
+    Returns (element, frame_index, xpath_index) or (None, -1, -1).
+    """
+    driver.switch_to.default_content()
+    best = None  # (xpath_index, frame_index, element)
+    hit = _find_first_in_current_frame(driver, xpaths)
+    if hit:
+        best = (hit[0], 0, hit[1])
+    if best is None or best[0] > 0:
+        try:
+            n_frames = len(driver.find_elements("tag name", "iframe"))
+        except Exception:
+            n_frames = 0
+        for idx in range(n_frames):
+            try:
+                driver.switch_to.default_content()
+                driver.switch_to.frame(idx)
+            except Exception:
+                continue
+            hit = _find_first_in_current_frame(driver, xpaths)
+            if hit and (best is None or hit[0] < best[0]):
+                best = (hit[0], idx + 1, hit[1])
+                if best[0] == 0:
+                    break
+    driver.switch_to.default_content()
+    if best is None:
+        return None, -1, -1
+    if best[1]:
+        driver.switch_to.frame(best[1] - 1)
+    return best[2], best[1], best[0]
+
+
+# Location modal openers tried before playing back a recording that starts at the search input
+_PLAYBACK_OPENER_XPATHS = (
+    "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'select location')]",
+    "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'deliver to')]",
+    "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'change location')]",
+)
+
+
 def _playback_pincode_flow(driver, pincode: str) -> bool:
     """
     Play back recorded steps from pincode_flow.json; substitute pincode for <PIN>.
@@ -727,21 +1430,15 @@ def _playback_pincode_flow(driver, pincode: str) -> bool:
     # If first step is the search/location input, open the location modal first so it's visible
     first = steps[0] if steps else {}
     if first.get("action") == "click" and "placeholder" in str(first.get("value", "")):
-        for xpath in [
-            "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'select location')]",
-            "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'deliver to')]",
-            "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'change location')]",
-        ]:
-            try:
-                el, _ = _find_element_any_frame(driver, By.XPATH, xpath)
-                if el and el.is_displayed():
-                    el.click()
-                    time.sleep(2)
-                    break
-            except Exception:
-                pass
-
-    last_selector = None
+        try:
+            el, _, _ = _find_first_any_frame(driver, _PLAYBACK_OPENER_XPATHS)
+            if el:
+                el.click()
+                time.sleep(2)
+        except Exception:
+            pass
+
+    last_selector = None
     for i, s in enumerate(steps):
         action = s.get("action")
         by, val = s.get("by"), s.get("value")
@@ -786,39 +1483,66 @@ def _playback_pincode_flow(driver, pincode: str) -> bool:
                     el.send_keys(text)
                 time.sleep(1.2)
         except Exception as e:
-            print(f"  (Playback step {i+1} failed: {e})", file=sys.stderr)
+            log.warning(f"  (Playback step {i+1} failed: {e})")
     driver.switch_to.default_content()
     time.sleep(2)
     return True
 
 
-def _set_pincode_via_cookies(driver, pincode: str) -> bool:
+def _wait_for_pincode_on_page(driver, pin: str, timeout: float = 8) -> bool:
+    """Wait (polling every 0.5s) until pin shows in the header after a reload; fall back to body text / HTML (checked in-page)."""
+    try:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        WebDriverWait(driver, timeout, poll_frequency=0.5).until(EC.text_to_be_present_in_element((By.TAG_NAME, "header"), pin))
+        return True
+    except Exception:
+        pass
+    # One round trip returning a boolean instead of transferring body text and page source
+    try:
+        return driver.execute_script(
+            "var p = arguments[0];"
+            "return (document.body && document.body.innerText.indexOf(p) !== -1)"
+            " || document.documentElement.outerHTML.indexOf(p) !== -1;",
+            pin,
+        ) is True
+    except Exception:
+        return False
+
+
+def _set_pincode_unified(driver, pincode: str) -> bool:
     """
-    Set pincode by writing BigBasket's location cookies directly (from places API lat/lng).
-    Gets lat/lng via places autocomplete + details in browser, then sets _bb_pin_code,
-    _bb_lat_long, _bb_addressinfo; refresh and verify.
+    Set pincode in one async script: places autocomplete -> details, then (in parallel) write BigBasket's
+    location cookies (_bb_pin_code, _bb_lat_long, _bb_addressinfo) and call the serviceable API the site
+    itself uses; one refresh and verify.
     """
     pin = (pincode or "").strip()
     if not pin:
         return False
-    # Get lat, lng, area, city from places API in browser (same domain/cookies)
-    js_get_location = """
+    # Cookie formats from recorded session: _bb_pin_code plain, _bb_lat_long base64(lat|lng),
+    # _bb_addressinfo base64(lat|lng|area|pincode|city|1|false|true|true|Bigbasketeer)
+    js_set_location = """
     var pin = arguments[0];
     var callback = arguments[arguments.length - 1];
     var token = Math.random().toString(36).slice(2, 34);
+    function b64(s) { return btoa(unescape(encodeURIComponent(s))); }
+    function setCookie(name, value, secure) {
+        document.cookie = name + '=' + value + '; path=/; domain=.bigbasket.com; SameSite=Lax' + (secure ? '; Secure' : '');
+    }
     fetch('https://www.bigbasket.com/places/v1/places/autocomplete/?inputText=' + encodeURIComponent(pin) + '&token=' + token, { credentials: 'include' })
     .then(function(r) { return r.json(); })
     .then(function(data) {
         var preds = data.predictions || data.results || data.places || [];
-        if (!preds.length) { callback(null); return; }
+        if (!preds.length) { callback(false); return; }
         var first = preds[0];
         var placeId = first.place_id || first.id || first.placeId;
         var area = (first.description || first.formatted_address || '').trim();
-        if (!placeId) { callback(null); return; }
+        if (!placeId) { callback(false); return; }
         return fetch('https://www.bigbasket.com/places/v1/places/details/?placeId=' + placeId + '&token=' + Math.random().toString(36).slice(2, 34), { credentials: 'include' })
             .then(function(r) { return r && r.json ? r.json() : null; })
             .then(function(details) {
-                if (!details) { callback(null); return; }
+                if (!details) { callback(false); return; }
                 var lat = details.lat || details.latitude;
                 var lng = details.lng || details.longitude;
                 if (lat == null && details.geometry && details.geometry.location) {
@@ -826,129 +1550,88 @@ def _set_pincode_via_cookies(driver, pincode: str) -> bool:
                     lng = details.geometry.location.lng;
                 }
                 if (lng == null && details.geometry) lng = details.geometry.location && details.geometry.location.lng;
-                if (lat == null || lng == null) { callback(null); return; }
+                if (lat == null || lng == null) { callback(false); return; }
                 var city = (details.locality || details.city || (details.address_components && details.address_components[0] && details.address_components[0].long_name) || '').trim();
                 if (!area && details.formatted_address) area = details.formatted_address;
-                callback({ lat: lat, lng: lng, area: area || '', city: city || '' });
+                area = (area || '').trim() || pin;
+                var latLng = lat + '|' + lng;
+                var addr = [latLng, area, pin, city || '', '1', 'false', 'true', 'true', 'Bigbasketeer'].join('|');
+                return Promise.all([
+                    Promise.resolve().then(function() {
+                        setCookie('_bb_pin_code', pin, false);
+                        setCookie('_bb_lat_long', b64(latLng), true);
+                        setCookie('_bb_addressinfo', b64(addr), false);
+                    }),
+                    // Server-side location (sets the site's own cookies); cookie writes alone may be enough, so failure is ignored
+                    fetch('https://www.bigbasket.com/ui-svc/v1/serviceable/?lat=' + lat + '&lng=' + lng + '&send_all_serviceability=true', { credentials: 'include' })
+                        .catch(function() { return null; })
+                ]).then(function() { callback(true); });
             });
     })
-    .catch(function() { callback(null); });
+    .catch(function() { callback(false); });
     """
     try:
-        loc = driver.execute_async_script(js_get_location, pin)
-        if not loc or not isinstance(loc, dict) or loc.get("lat") is None or loc.get("lng") is None:
-            return False
-        lat = loc["lat"]
-        lng = loc["lng"]
-        area = (loc.get("area") or "").strip() or pin
-        city = (loc.get("city") or "").strip()
-        # Cookie formats from recorded session: _bb_pin_code plain, _bb_lat_long base64(lat|lng), _bb_addressinfo base64(lat|lng|area|pincode|city|1|false|true|true|Bigbasketeer)
-        lat_lng_str = f"{lat}|{lng}"
-        addr_parts = [lat_lng_str, area, pin, city, "1", "false", "true", "true", "Bigbasketeer"]
-        addr_str = "|".join(addr_parts)
-        lat_long_b64 = base64.b64encode(lat_lng_str.encode("utf-8")).decode("ascii")
-        addr_b64 = base64.b64encode(addr_str.encode("utf-8")).decode("ascii")
-        domain = ".bigbasket.com"
-        # Must be on domain to add cookies
+        # Must be on domain for fetch credentials and document.cookie
         if "bigbasket.com" not in (driver.current_url or ""):
             driver.get("https://www.bigbasket.com/")
-            time.sleep(1)
-        for name, value, secure in [
-            ("_bb_pin_code", pin, False),
-            ("_bb_lat_long", lat_long_b64, True),
-            ("_bb_addressinfo", addr_b64, False),
-        ]:
-            try:
-                driver.add_cookie({
-                    "name": name,
-                    "value": value,
-                    "path": "/",
-                    "domain": domain,
-                    "secure": secure,
-                    "sameSite": "Lax",
-                })
-            except Exception as e:
-                print(f"  (Cookie {name} failed: {e})", file=sys.stderr)
-                return False
-        time.sleep(0.5)
+        if driver.execute_async_script(js_set_location, pin) is not True:
+            return False
         driver.refresh()
-        time.sleep(3)
-        # Verify pincode appears on page
-        try:
-            body = driver.find_element("tag name", "body").text
-            if pin in body:
-                return True
-            if pin in (driver.page_source or ""):
-                return True
-        except Exception:
-            pass
-        return False
+        # Verify pincode appears on page (API can return 200 but UI not update)
+        return _wait_for_pincode_on_page(driver, pin)
     except Exception as e:
-        print(f"  (Set pincode via cookies failed: {e})", file=sys.stderr)
+        log.warning(f"  (Set pincode via cookies/API failed: {e})")
     return False
 
 
-def _set_pincode_via_api_in_browser(driver, pincode: str) -> bool:
-    """
-    Set pincode by calling BigBasket's places API from the browser (same flow as the site).
-    Uses the page's cookies so location cookies get set; then refresh. No UI automation.
-    """
-    pin = (pincode or "").strip()
-    if not pin:
-        return False
-    js = """
-    var pin = arguments[0];
-    var callback = arguments[arguments.length - 1];
-    var token = Math.random().toString(36).slice(2, 34);
-    fetch('https://www.bigbasket.com/places/v1/places/autocomplete/?inputText=' + encodeURIComponent(pin) + '&token=' + token, { credentials: 'include' })
-    .then(function(r) { return r.json(); })
-    .then(function(data) {
-        var preds = data.predictions || data.results || data.places || [];
-        if (!preds.length) { callback(false); return; }
-        var first = preds[0];
-        var placeId = first.place_id || first.id || first.placeId;
-        if (!placeId) { callback(false); return; }
-        return fetch('https://www.bigbasket.com/places/v1/places/details/?placeId=' + placeId + '&token=' + Math.random().toString(36).slice(2, 34), { credentials: 'include' });
-    })
-    .then(function(r) { return r && r.json ? r.json() : null; })
-    .then(function(details) {
-        if (!details) { callback(false); return; }
-        var lat = details.lat || details.latitude;
-        var lng = details.lng || details.longitude;
-        if (lat == null && details.geometry && details.geometry.location) {
-            lat = details.geometry.location.lat;
-            lng = details.geometry.location.lng;
-        }
-        if (lng == null && details.geometry) lng = details.geometry.location && details.geometry.location.lng;
-        if (lat == null || lng == null) { callback(false); return; }
-        return fetch('https://www.bigbasket.com/ui-svc/v1/serviceable/?lat=' + lat + '&lng=' + lng + '&send_all_serviceability=true', { credentials: 'include' });
-    })
-    .then(function(r) { return r && r.ok; })
-    .then(function(ok) { callback(ok === true); })
-    .catch(function() { callback(false); });
-    """
-    try:
-        result = driver.execute_async_script(js, pin)
-        if result is True:
-            time.sleep(1)
-            driver.refresh()
-            time.sleep(3)
-            # Verify pincode actually appears on page (API can return 200 but UI not update)
-            try:
-                body = driver.find_element("tag name", "body").text
-                if pin in body:
-                    return True
-                # Some UIs show area name; check for common location text that implies pincode was set
-                page_src = driver.page_source or ""
-                if pin in page_src:
-                    return True
-            except Exception:
-                pass
-            # API said OK but pincode not visible on page
-            return False
-    except Exception as e:
-        print(f"  (API pincode failed: {e})", file=sys.stderr)
-    return False
+# Candidate xpaths for the heuristic pincode flow (tried in order, main document and iframes)
+# When no location: "Select Location" / "Deliver to". When location set: "122001, Gurgaon" / "Delivery in 8 mins"
+_LOCATION_OPENER_XPATHS = (
+    "//header//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'select location')]",
+    "//header//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'deliver to')]",
+    "//header//*[contains(., 'Delivery in') or contains(., '122001') or contains(., 'Gurgaon')]",
+    "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'select location')]",
+    "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'deliver to')]",
+    "//*[contains(., 'Delivery in')]",
+    "//*[contains(., '122001') and string-length(normalize-space(.)) < 30]",
+)
+_INPUT_XPATHS = (
+    "//input[contains(@placeholder, 'Search for area') or contains(@placeholder, 'area or street')]",
+    "//input[contains(translate(@placeholder, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'pincode')]",
+    "//input[contains(translate(@placeholder, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'area')]",
+    "//input[contains(translate(@placeholder, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'location')]",
+)
+_SUGGESTION_XPATHS = (
+    "//ul//li[.//span or .//div][1]",
+    "//li[contains(@class,'suggestion') or contains(@class,'option') or contains(@class,'item')]",
+    "//*[@role='option']",
+)
+_SUGGESTION_OR_CONTINUE_XPATHS = _SUGGESTION_XPATHS + (
+    "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'continue')]",
+)
+
+
+# Resolves true as soon as one of the xpaths (arguments[0]) has a rendered match in this frame, false after arguments[1] ms;
+# a MutationObserver reacts to the autocomplete list being inserted instead of polling for it
+_WAIT_FOR_XPATHS_JS = """
+var xs = arguments[0], timeoutMs = arguments[1], cb = arguments[arguments.length - 1];
+function found() {
+  for (var i = 0; i < xs.length; i++) {
+    try {
+      var r = document.evaluate(xs[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+      if (r && r.getClientRects().length) return true;
+    } catch (e) {}
+  }
+  return false;
+}
+if (found()) { cb(true); return; }
+var done = false;
+var obs = new MutationObserver(function() {
+  if (!done && found()) { done = true; obs.disconnect(); cb(true); }
+});
+obs.observe(document.body || document.documentElement, { childList: true, subtree: true, attributes: true });
+setTimeout(function() { if (!done) { done = true; obs.disconnect(); cb(false); } }, timeoutMs);
+"""
 
 
 def _set_pincode_heuristic(driver, pincode: str) -> bool:
@@ -960,6 +1643,7 @@ def _set_pincode_heuristic(driver, pincode: str) -> bool:
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
         from selenium.webdriver.common.keys import Keys
+        from selenium.common.exceptions import TimeoutException
     except ImportError:
         return False
     pin = (pincode or "").strip()
@@ -967,153 +1651,342 @@ def _set_pincode_heuristic(driver, pincode: str) -> bool:
         return False
     wait = WebDriverWait(driver, 15)
     def _click_location_opener():
-        # When no location: "Select Location" / "Deliver to". When location set: "122001, Gurgaon" / "Delivery in 8 mins"
-        for xpath in [
-            "//header//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'select location')]",
-            "//header//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'deliver to')]",
-            "//header//*[contains(., 'Delivery in') or contains(., '122001') or contains(., 'Gurgaon')]",
-            "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'select location')]",
-            "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'deliver to')]",
-            "//*[contains(., 'Delivery in')]",
-            "//*[contains(., '122001') and string-length(normalize-space(.)) < 30]",
-        ]:
+        el, _, _ = _find_first_any_frame(driver, _LOCATION_OPENER_XPATHS)
+        if not el:
+            return False
+        try:
+            el.click()
+        except Exception:
             try:
-                el, _ = _find_element_any_frame(driver, By.XPATH, xpath)
-                if el and el.is_displayed():
-                    try:
-                        el.click()
-                    except Exception:
-                        try:
-                            driver.execute_script("arguments[0].click();", el)
-                        except Exception:
-                            pass
-                    return True
+                driver.execute_script("arguments[0].click();", el)
             except Exception:
                 pass
-        return False
+        return True
 
     def _find_input():
-        input_xpaths = [
-            "//input[contains(@placeholder, 'Search for area') or contains(@placeholder, 'area or street')]",
-            "//input[contains(translate(@placeholder, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'pincode')]",
-            "//input[contains(translate(@placeholder, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'area')]",
-            "//input[contains(translate(@placeholder, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'location')]",
-        ]
-        for xpath in input_xpaths:
-            el, _ = _find_element_any_frame(driver, By.XPATH, xpath)
-            if el and el.is_displayed():
-                return el
-        return None
+        el, _, _ = _find_first_any_frame(driver, _INPUT_XPATHS)
+        return el
+
+    def _suggestion_shown():
+        return _find_first_any_frame(driver, _SUGGESTION_XPATHS)[0] is not None
 
     def _click_first_suggestion():
-        for xpath in [
-            "//ul//li[.//span or .//div][1]",
-            "//li[contains(@class,'suggestion') or contains(@class,'option') or contains(@class,'item')]",
-            "//*[@role='option']",
-            "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'continue')]",
-        ]:
-            try:
-                el, _ = _find_element_any_frame(driver, By.XPATH, xpath)
-                if el and el.is_displayed():
-                    el.click()
-                    return True
-            except Exception:
-                pass
-        return False
+        el, _, _ = _find_first_any_frame(driver, _SUGGESTION_OR_CONTINUE_XPATHS)
+        if not el:
+            return False
+        try:
+            el.click()
+            return True
+        except Exception:
+            return False
+
+    def _wait(timeout, condition):
+        """WebDriverWait polling every 0.5s; returns the condition's value or None on timeout."""
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=0.5).until(condition)
+        except TimeoutException:
+            return None
 
     try:
         driver.switch_to.default_content()
-        time.sleep(2)
         try:
             wait.until(EC.presence_of_element_located((By.XPATH, "//*[contains(., 'Delivery') or contains(., 'Select') or contains(., 'Deliver')]")))
         except Exception:
             pass
-        print("  Clicking location (Select Location / Deliver to / 122001)...")
+        log.info("  Clicking location (Select Location / Deliver to / 122001)...")
         if not _click_location_opener():
-            print("  Could not find or click location opener.", file=sys.stderr)
+            log.warning("  Could not find or click location opener.")
             return False
-        time.sleep(4)
-        inp = None
-        for _ in range(8):
-            inp = _find_input()
-            if inp:
-                break
-            time.sleep(1)
+        # Input may live in the main document or an iframe; each poll checks all of them
+        inp = _wait(10, lambda d: _find_input() or False)
         if not inp:
-            print("  Location modal did not open or pincode input not found.", file=sys.stderr)
+            log.warning("  Location modal did not open or pincode input not found.")
             return False
-        print("  Typing pincode...")
+        log.info("  Typing pincode...")
         inp.clear()
         inp.send_keys(pin)
-        time.sleep(2)
+        # Suggestions render in the input's frame (the driver is still switched there)
+        try:
+            driver.execute_async_script(_WAIT_FOR_XPATHS_JS, list(_SUGGESTION_XPATHS), 5000)
+        except Exception:
+            _wait(5, lambda d: _suggestion_shown())
         try:
             inp.send_keys(Keys.ARROW_DOWN)
             time.sleep(0.3)
             inp.send_keys(Keys.ENTER)
         except Exception:
             pass
-        time.sleep(1.5)
-        print("  Selecting first suggestion...")
-        _click_first_suggestion()
-        time.sleep(2)
+        log.info("  Selecting first suggestion...")
+        _wait(5, lambda d: _click_first_suggestion())
+        _wait(5, EC.invisibility_of_element(inp))
         driver.switch_to.default_content()
         if "/choose-city" in driver.current_url:
             driver.get("https://www.bigbasket.com/")
-            time.sleep(2)
-        print("  Pincode set.")
+        log.info("  Pincode set.")
         return True
     except Exception as e:
-        print(f"  Heuristic pincode failed: {e}", file=sys.stderr)
+        log.warning(f"  Heuristic pincode failed: {e}")
         driver.switch_to.default_content()
         return False
 
 
 def _set_pincode_in_browser(driver, pincode: str) -> bool:
     """
-    Set delivery pincode: try cookies first (set _bb_pin_code, _bb_lat_long, _bb_addressinfo),
-    then API (serviceable), then heuristic, then playback.
+    Set delivery pincode: cookies + serviceable API in one script first (cheapest, usually works),
+    then heuristic UI, then playback.
     Returns True if pincode was set, False otherwise.
     """
     pin = (pincode or "").strip()
     if not pin:
         return False
 
-    print("Setting pincode (cookies)...")
-    if _set_pincode_via_cookies(driver, pin):
-        print("Pincode set via cookies.")
-        return True
-    print("Setting pincode (API)...")
-    if _set_pincode_via_api_in_browser(driver, pin):
-        print("Pincode set via API.")
+    log.info("Setting pincode (cookies + API)...")
+    if _set_pincode_unified(driver, pin):
+        log.info("Pincode set via cookies + API.")
         return True
-    print("API did not update location (or verification failed); trying UI...")
-    print("Setting pincode (heuristic)...")
+    log.info("Cookies/API did not update location (or verification failed); trying UI...")
+    log.info("Setting pincode (heuristic)...")
     if _set_pincode_heuristic(driver, pin):
         return True
     if PINCODE_FLOW_FILE.exists():
-        print("Trying recorded flow (pincode_flow.json)...")
+        log.info("Trying recorded flow (pincode_flow.json)...")
         _playback_pincode_flow(driver, pin)
         time.sleep(2)
         return True
     return False
 
 
-def run_with_browser(product_urls: list[str], pincodes: list[str], config: dict | None = None) -> None:
+def _wait_for_body(driver, timeout: float = 10) -> None:
     """
-    Check stock using a real Chrome window (like deepakksahu/bigbasket_slot_notifier).
-    For each pincode: set location via cookies, then check every product (API then page fallback).
+    Wait until the page has finished loading (readyState complete, so images are in even with the eager
+    load strategy) before a screenshot; returns silently on timeout.
     """
-    # BigBasket blocks headless Chrome. Use minimized (real window, minimized) instead of headless.
-    headless = bool(config.get("headless", False)) if config else False
-    minimized = bool(config.get("minimized", False)) if config else False
-    driver = _get_driver(headless=headless)
-    if not driver:
-        sys.exit(1)
+    try:
+        from selenium.webdriver.support.ui import WebDriverWait
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            lambda d: d.execute_script("return document.body !== null && document.readyState === 'complete';")
+        )
+    except Exception:
+        pass
+
+
+# Assets a stock check never needs (images, fonts, trackers); blocked via CDP except while taking a screenshot
+_BLOCKED_ASSET_URLS = (
+    "*.jpg", "*.jpeg", "*.png", "*.webp", "*.gif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*facebook*", "*clarity*",
+)
+
+
+def _set_asset_blocking(driver, block: bool) -> bool:
+    """Block (or unblock) _BLOCKED_ASSET_URLS with CDP Network.setBlockedURLs. Returns False if CDP is unavailable."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(_BLOCKED_ASSET_URLS) if block else []})
+        return True
+    except Exception:
+        return False
+
+
+def _learn_build_id_in_browser(driver) -> str | None:
+    """Read buildId from the loaded page's __NEXT_DATA__ (one small script, no page_source) and remember it."""
+    try:
+        build_id = driver.execute_script(
+            "var s = document.getElementById('__NEXT_DATA__');"
+            "try { return s ? JSON.parse(s.textContent).buildId || null : null; } catch (e) { return null; }"
+        )
+    except Exception:
+        return None
+    if build_id and isinstance(build_id, str):
+        _remember_build_id(build_id)
+        return build_id
+    return None
+
+
+def _capture_screenshot_b64(driver) -> str | None:
+    """
+    Viewport screenshot as base64: JPEG (quality 70) via CDP Page.captureScreenshot when available,
+    several times smaller than WebDriver's PNG; falls back to get_screenshot_as_base64.
+    """
+    try:
+        result = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "jpeg", "quality": 70, "captureBeyondViewport": False})
+        if result and result.get("data"):
+            return result["data"]
+    except Exception:
+        pass
+    return driver.get_screenshot_as_base64()
+
+
+def _open_bigbasket(driver, headless: bool, minimized: bool) -> None:
+    """Open the BigBasket homepage (minimized or maximized window); learn the buildId there if none is cached."""
+    driver.get("https://www.bigbasket.com/")
     if minimized and not headless:
         try:
             driver.minimize_window()
         except Exception:
             pass
+    else:
+        driver.maximize_window()
+    time.sleep(2)
+    if not _cached_build_id():
+        _learn_build_id_in_browser(driver)
+
+
+def _prepare_pincode(driver, pin: str, config: dict, input_lock: threading.Lock) -> None:
+    """Clear cookies, apply pincode_session_record.json cookies, then set pin (auto or by asking the user)."""
+    # Clear cookies and inject fresh cookies on every pincode change
+    try:
+        driver.delete_all_cookies()
+    except Exception:
+        pass
+    driver.get("https://www.bigbasket.com/")
+    time.sleep(2)
+    if PINCODE_SESSION_RECORD_FILE.exists():
+        try:
+            rec = load_json(PINCODE_SESSION_RECORD_FILE, None)
+            cookies = rec.get("cookies") if isinstance(rec, dict) else []
+            for c in cookies:
+                try:
+                    driver.add_cookie(c)
+                except Exception:
+                    pass
+            driver.refresh()
+            time.sleep(2)
+            log.info("Applied cookies from pincode_session_record.json")
+        except Exception:
+            pass
+
+    if pin == "browser":
+        with input_lock:
+            log.info("Set your delivery pincode in the browser, then press Enter here...")
+            input()
+    elif config.get("auto_pincode", True):
+        log.info(f"Setting delivery pincode to {pin}...")
+        if _set_pincode_in_browser(driver, pin):
+            log.info("Pincode set.")
+        else:
+            with input_lock:
+                log.info(f"Auto pincode failed. Set pincode {pin} in the browser, then press Enter here...")
+                input()
+    else:
+        with input_lock:
+            log.info(f"Set delivery pincode to {pin} in the browser, then press Enter here...")
+            input()
+
+
+@dataclass(slots=True)
+class BrowserTab:
+    """A driver plus whether asset blocking (block_assets) is in use on it."""
+    driver: object
+    assets_blocked: bool = False
+
+    def set_blocking(self, block: bool) -> None:
+        if self.assets_blocked:
+            _set_asset_blocking(self.driver, block)
+
+
+def _check_product(tab: BrowserTab, pid: str, slug: str, url: str, pin: str, config: dict) -> dict:
+    """
+    Check one product in the browser for pin: API first (if check_stock_via_api, with the cached buildId), page fallback.
+    Prints the result and sends error / in-stock Telegram alerts. Returns dict with status, title.
+    """
+    driver = tab.driver
+    pretty = _pretty_title(slug)
+    log.info(f"  Checking: {pretty}...")
+    result_status, result_title, error_detail = None, None, "Check failed"
+    build_id = _cached_build_id()
+    if config.get("check_stock_via_api", True) and build_id:
+        result_status, result_title = check_one_via_api_in_browser(driver, pid, slug, build_id)
+    # A definitive API answer (in_stock / out_of_stock) is trusted as is: no page load to verify it
+    if result_status is None or result_status == "unknown":
+        driver.get(url)
+        time.sleep(3)
+        if not _cached_build_id():
+            _learn_build_id_in_browser(driver)
+        html = driver.page_source
+        if not html or "Access Denied" in html:
+            result_status, result_title = "error", pretty
+            error_detail = "Access Denied or page failed"
+        else:
+            result_status, result_title = parse_stock_from_html(html)
+            if not result_title:
+                result_title = pretty
+    else:
+        if not result_title:
+            result_title = pretty
+    if result_status and result_status != "error":
+        log.info(f"  {result_title or pretty}: {result_status.upper()}")
+    elif result_status == "error":
+        log.info(f"  {result_title or pretty}: ERROR")
+        _send_telegram_error(config, result_title or pretty, pin, url, error_detail)
+    title = result_title if result_status != "error" else pretty
+
+    # Each product if in_stock: send one Telegram message (with screenshot when enabled)
+    if result_status == "in_stock":
+        caption = f"BigBasket: {title} is in stock @ pincode {pin}\n\n{url}"
+        # Navigate for a screenshot only when it will actually be sent (screenshots on and Telegram configured)
+        if config.get("telegram_send_screenshot", True) and _tg_token_chat(config) is not None:
+            try:
+                # Load the product with images (block_assets is lifted for this one load)
+                tab.set_blocking(False)
+                driver.get(url)
+                _wait_for_body(driver)
+                # Base64 straight from Chrome; decoding and upload happen on the Telegram pool
+                screenshot_b64 = _capture_screenshot_b64(driver)
+                if screenshot_b64:
+                    _send_telegram_photo(config, screenshot_b64, caption)
+                else:
+                    _TG_BATCHER.enqueue(config, {"title": title, "pincode": pin, "url": url, "to": "in_stock"})
+            except Exception as e:
+                log.warning(f"  (Screenshot failed: {e}, sending text only)")
+                _TG_BATCHER.enqueue(config, {"title": title, "pincode": pin, "url": url, "to": "in_stock"})
+            finally:
+                tab.set_blocking(True)
+        else:
+            _TG_BATCHER.enqueue(config, {"title": title, "pincode": pin, "url": url, "to": "in_stock"})
+    return {"status": result_status, "title": title}
+
+
+# With --loop in browser mode, Chrome is reused across runs and restarted after this many runs
+BROWSER_RESTART_EVERY = 20
+
+
+def _quit_drivers(drivers: list) -> None:
+    """Quit every driver in drivers and empty the list."""
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    drivers.clear()
+
+
+def _driver_alive(driver) -> bool:
+    """Cheap health check: the browser still answers WebDriver commands."""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def run_with_browser(product_urls: list[str], pincodes: list[str], config: dict | None = None, drivers: list | None = None) -> None:
+    """
+    Check stock using a real Chrome window (like deepakksahu/bigbasket_slot_notifier).
+    For each pincode: set location via cookies, then check every product (API then page fallback).
+    With config["browser_workers"] > 1, the product × pincode checks are split into that many contiguous slices,
+    each run by its own Chrome instance in parallel; manual pincode entry always uses a single browser.
+    If drivers (a list) is given, Chrome instances in it are reused and kept open for the next call (--loop);
+    dead ones are replaced, and all are quit if the run fails. Otherwise Chrome is started and quit here.
+    """
+    _setup_log_output()
+    if config is None:
+        config = load_json(CONFIG_FILE, {})
+    # BigBasket blocks headless Chrome. Use minimized (real window, minimized) instead of headless.
+    headless = bool(config.get("headless", False))
+    minimized = bool(config.get("minimized", False))
+    # Stock checks only need the DOM, not every image; set "normal" if a page needs full load
+    page_load_strategy = str(config.get("page_load_strategy") or "eager")
     # Dedupe pincodes, keep order
     seen = set()
     pincode_list = []
@@ -1124,150 +1997,138 @@ def run_with_browser(product_urls: list[str], pincodes: list[str], config: dict
             pincode_list.append(pin)
     if not pincode_list:
         pincode_list = ["browser"]
-    state = load_json(STATE_FILE, {})
-    changes = []
-    if config is None:
-        config = load_json(CONFIG_FILE, {})
-
-    try:
-        print("Opening BigBasket in Chrome...")
-        driver.get("https://www.bigbasket.com/")
+    products = []
+    for url in product_urls:
+        url = url.strip()
+        if not url or url.startswith("#"):
+            continue
+        pid, slug = parse_product_url(url)
+        if not pid or not slug:
+            log.info(f"  Skip (invalid URL): {url[:50]}...")
+            continue
+        products.append((pid, slug, url))
+
+    # (pincode, product) tasks grouped by pincode; each worker gets one contiguous slice, so it sets a pincode
+    # only when its slice moves on to the next one (and a pincode can be shared by several workers)
+    tasks = [(pin, product) for pin in pincode_list for product in products]
+    manual = pincode_list == ["browser"] or not config.get("auto_pincode", True)
+    workers = 1 if manual else max(1, min(int(config.get("browser_workers", 1)), len(tasks)))
+    owned = drivers is None
+    if owned:
+        drivers = []
+    for driver in [d for d in drivers if not _driver_alive(d)]:
+        drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    while len(drivers) < workers:
+        driver = _get_driver(headless=headless, page_load_strategy=page_load_strategy)
+        if not driver:
+            break
         if minimized and not headless:
             try:
                 driver.minimize_window()
             except Exception:
                 pass
-        else:
-            driver.maximize_window()
-        time.sleep(2)
-        build_id = get_build_id_from_html(driver.page_source or "")
-        if not build_id:
-            build_id = "TiBvbC2dBTBqbHRDcdku3"
-        use_api = config.get("check_stock_via_api", True)
-
-        for pin in pincode_list:
-            # Clear cookies and inject fresh cookies on every pincode change
-            try:
-                driver.delete_all_cookies()
-            except Exception:
-                pass
-            driver.get("https://www.bigbasket.com/")
-            time.sleep(2)
-            if PINCODE_SESSION_RECORD_FILE.exists():
-                try:
-                    rec = load_json(PINCODE_SESSION_RECORD_FILE, None)
-                    cookies = rec.get("cookies") if isinstance(rec, dict) else []
-                    for c in cookies:
-                        try:
-                            driver.add_cookie(c)
-                        except Exception:
-                            pass
-                    driver.refresh()
-                    time.sleep(2)
-                    print("Applied cookies from pincode_session_record.json")
-                except Exception:
-                    pass
-
-            if pin == "browser":
-                print("Set your delivery pincode in the browser, then press Enter here...")
-                input()
-            elif config.get("auto_pincode", True):
-                print(f"Setting delivery pincode to {pin}...")
-                if _set_pincode_in_browser(driver, pin):
-                    print("Pincode set.")
-                else:
-                    print("Auto pincode failed. Set pincode in the browser, then press Enter here...")
-                    input()
-            else:
-                print(f"Set delivery pincode to {pin} in the browser, then press Enter here...")
-                input()
-
-            print(f"--- Pincode {pin} ---")
-            for url in product_urls:
-                url = url.strip()
-                if not url or url.startswith("#"):
-                    continue
-                pid, slug = parse_product_url(url)
-                if not pid or not slug:
-                    print(f"  Skip (invalid URL): {url[:50]}...")
-                    continue
-
-                print(f"  Checking: {slug.replace('-', ' ').title()}...")
-                result_status, result_title, error_detail = None, None, "Check failed"
-                if use_api and build_id:
-                    result_status, result_title = check_one_via_api_in_browser(driver, pid, slug, build_id)
-                if result_status is None or result_status == "unknown":
-                    driver.get(url)
-                    time.sleep(3)
-                    html = driver.page_source
-                    if not html or "Access Denied" in html:
-                        result_status, result_title = "error", slug.replace("-", " ").title()
-                        error_detail = "Access Denied or page failed"
-                    else:
-                        result_status, result_title = parse_stock_from_html(html)
-                        if not result_title:
-                            result_title = slug.replace("-", " ").title()
-                else:
-                    if not result_title:
-                        result_title = slug.replace("-", " ").title()
-                if result_status and result_status != "error":
-                    print(f"  {result_title or slug.replace('-', ' ').title()}: {result_status.upper()}")
-                elif result_status == "error":
-                    print(f"  {result_title or slug.replace('-', ' ').title()}: ERROR")
-                    _send_telegram_error(config, result_title or slug.replace("-", " ").title(), pin, url, error_detail)
+        drivers.append(driver)
+    if not drivers:
+        sys.exit(1)
+    active = drivers[:workers]
 
-                key = f"{pid}|{pin}"
+    state = load_json(STATE_FILE, {})
+    changes = []
+    cache = load_json(SESSION_CACHE_FILE, {})
+    _restore_build_id(cache)
+    lock = threading.Lock()
+    input_lock = threading.Lock()
+
+    def flush_state() -> None:
+        # After each pincode: a Ctrl+C or crash mid-run keeps the results so far (save_json is atomic)
+        with lock:
+            save_json(STATE_FILE, state, indent=False)
+
+    def work(driver, slice_: list[tuple]) -> None:
+        tab = BrowserTab(driver, bool(config.get("block_assets", True)) and _set_asset_blocking(driver, True))
+        _open_bigbasket(driver, headless, minimized)
+        current_pin = None
+        for pin, (pid, slug, url) in slice_:
+            if pin != current_pin:
+                if current_pin is not None:
+                    flush_state()
+                _prepare_pincode(driver, pin, config, input_lock)
+                current_pin = pin
+                log.info(f"--- Pincode {pin} ---")
+            result = _check_product(tab, pid, slug, url, pin, config)
+            key = f"{pid}|{pin}"
+            with lock:
                 prev = state.get(key, {})
                 state[key] = {
                     "url": url,
                     "slug": slug,
-                    "title": result_title if result_status != "error" else slug.replace("-", " ").title(),
-                    "status": result_status,
+                    "title": result["title"],
+                    "status": result["status"],
                     "pincode": pin,
                 }
-                if prev.get("status") and result_status != prev["status"]:
+                if prev.get("status") and result["status"] != prev["status"]:
                     changes.append({
-                        "title": result_title if result_status != "error" else slug.replace("-", " ").title(),
+                        "title": result["title"],
                         "pincode": pin,
                         "from": prev["status"],
-                        "to": result_status,
+                        "to": result["status"],
                         "url": url,
                     })
-                    if result_status == "in_stock":
-                        print(f"  [BACK IN STOCK] {result_title}")
-                # Each product if in_stock: send one Telegram message (with screenshot when enabled)
-                if result_status == "in_stock":
-                    title_display = result_title if result_status != "error" else slug.replace("-", " ").title()
-                    caption = f"BigBasket: {title_display} is in stock @ pincode {pin}\n\n{url}"
-                    if config.get("telegram_send_screenshot", True):
-                        try:
-                            if pid not in (driver.current_url or ""):
-                                driver.get(url)
-                                time.sleep(2)
-                            screenshot_bytes = driver.get_screenshot_as_png()
-                            if screenshot_bytes:
-                                _send_telegram_photo(config, screenshot_bytes, caption)
-                            else:
-                                _send_telegram_in_stock(config, {"title": title_display, "pincode": pin, "url": url, "to": "in_stock"})
-                        except Exception as e:
-                            print(f"  (Screenshot failed: {e}, sending text only)", file=sys.stderr)
-                            _send_telegram_in_stock(config, {"title": title_display, "pincode": pin, "url": url, "to": "in_stock"})
-                    else:
-                        _send_telegram_in_stock(config, {"title": title_display, "pincode": pin, "url": url, "to": "in_stock"})
-                time.sleep(2)
+                    if result["status"] == "in_stock":
+                        log.info(f"  [BACK IN STOCK] {result['title']}")
+            time.sleep(2)
+        if current_pin is not None:
+            flush_state()
 
-        save_json(STATE_FILE, state)
+    try:
+        log.info("Opening BigBasket in Chrome..." if len(active) == 1 else f"Opening BigBasket in {len(active)} Chrome windows...")
+        n = len(active)
+        slices = [tasks[k * len(tasks) // n:(k + 1) * len(tasks) // n] for k in range(n)]
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            futures = [pool.submit(work, d, sl) for d, sl in zip(active, slices)]
+            for f in futures:
+                f.result()
+
+        save_json(STATE_FILE, state, indent=False)
+        _persist_build_id(cache)
+        save_json(SESSION_CACHE_FILE, cache, indent=False)
         if changes:
-            print("--- Changes ---")
+            log.info("--- Changes ---")
             for c in changes:
-                print(f"  {c['title']} (@ {c['pincode']}): {c['from']} -> {c['to']}")
+                log.info(f"  {c['title']} (@ {c['pincode']}): {c['from']} -> {c['to']}")
             in_stock_changes = [c for c in changes if c.get("to") == "in_stock"]
             if in_stock_changes and not config.get("telegram_send_screenshot", True):
-                print(f"Sending Telegram for {len(in_stock_changes)} in_stock alert(s)...")
+                log.info(f"Sending Telegram for {len(in_stock_changes)} in_stock alert(s)...")
                 for c in in_stock_changes:
-                    _send_telegram_in_stock(config, c)
+                    _TG_BATCHER.enqueue(config, c)
+    except BaseException:
+        # Don't carry a browser in an unknown state into the next loop
+        _quit_drivers(drivers)
+        raise
     finally:
-        driver.quit()
+        if owned:
+            _quit_drivers(drivers)
+        _TG_BATCHER.flush()
+        _wait_telegram()
+
+
+def _session_from_file(path: Path) -> requests.Session | None:
+    """Session built from a HAR/curl/JSON session file; reused across --loop runs until the file changes."""
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    return _session_from_file_cached(str(path), mtime)
+
+
+@lru_cache(maxsize=4)
+def _session_from_file_cached(path: str, mtime: float) -> requests.Session | None:
+    loaded = load_session_from_file(path)
+    return _new_session(HEADERS, loaded) if loaded else None
 
 
 def run(product_urls: list[str], pincodes: list[str], session_file: str | Path | None = None, config: dict | None = None) -> None:
@@ -1275,89 +2136,119 @@ def run(product_urls: list[str], pincodes: list[str], session_file: str | Path |
     Check stock for each product × pincode. Save state, print results and changes.
     If session_file is set, use headers from that file (real user session) for all requests
     and skip the pincode API (inspired by shatadru/big_basket_automation).
+    All pincode × product checks share a pool of config["workers"] threads (default 4),
+    rate-limited by a token bucket (config["rps"], config["burst"]).
     """
+    _setup_log_output()
     if config is None:
         config = load_json(CONFIG_FILE, {})
     state = load_json(STATE_FILE, {})
     changes = []
+    workers = int(config.get("workers", 4))
+    # Politeness: shared by all workers and pincodes (default ~one page per 4s after a burst of 3)
+    bucket = TokenBucket(rate=float(config.get("rps", 0.25)), burst=float(config.get("burst", 3)))
+    cache = load_json(SESSION_CACHE_FILE, {})
+    _restore_build_id(cache)
+    _restore_latlng(cache)
 
     shared_session = None
     if session_file:
         path = Path(session_file) if not isinstance(session_file, Path) else session_file
         if not path.is_absolute():
             path = BASE / path
-        loaded = load_session_from_file(path)
-        if loaded:
-            shared_session = requests.Session()
-            shared_session.headers.update(HEADERS)
-            shared_session.headers.update(loaded)
-            print("Using session from file (real user session).")
-        else:
-            print("Could not load session file; falling back to pincode API.", file=sys.stderr)
-
-    for pincode in pincodes:
-        pin = pincode.strip()
-        if not pin:
-            continue
-        print(f"Pincode: {pin}")
-
+        shared_session = _session_from_file(path)
         if shared_session:
-            session = shared_session
+            log.info("Using session from file (real user session).")
         else:
-            session = set_pincode_session(pin)
-            if not session:
-                print("  (Could not set pincode via API; continuing anyway.)")
-                session = requests.Session()
-                session.headers.update(HEADERS)
-
-        for url in product_urls:
-            url = url.strip()
-            if not url or url.startswith("#"):
-                continue
-
-            result = check_one(url, pin, session)
-            pid = result.get("product_id") or result["url"]
-            key = f"{pid}|{pin}"
-            prev = state.get(key, {})
-            state[key] = {
-                "url": result["url"],
-                "slug": result.get("slug"),
-                "title": result.get("title"),
-                "status": result["status"],
-                "pincode": pin,
-            }
-
-            if result["status"] == "error":
-                _send_telegram_error(config, result.get("title") or result.get("slug") or pid, pin, result["url"], result.get("error") or "Check failed")
-            if prev.get("status") and result["status"] != prev["status"]:
-                changes.append({
-                    "title": result.get("title") or result.get("slug") or pid,
+            log.warning("Could not load session file; falling back to pincode API.")
+
+    pins = [p.strip() for p in pincodes if p.strip()]
+    # Pincode sessions: cached ones are reused; the rest are set up concurrently (3 API calls each) before any checks
+    sessions = {}
+    missing = []
+    if not shared_session:
+        for pin in pins:
+            sessions[pin] = _load_cached_session(cache, pin)
+        missing = [pin for pin in pins if sessions[pin] is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as pool:
+                for pin, session in zip(missing, pool.map(set_pincode_session, missing)):
+                    sessions[pin] = session
+                    if session:
+                        _store_cached_session(cache, pin, session)
+
+    urls = [u.strip() for u in product_urls if u.strip() and not u.strip().startswith("#")]
+    notes = {}
+    if not shared_session:
+        for pin in pins:
+            if not sessions.get(pin):
+                notes[pin] = "  (Could not set pincode via API; continuing anyway.)"
+                sessions[pin] = _new_session(HEADERS)
+            elif pin not in missing:
+                notes[pin] = "  (Using cached pincode session.)"
+
+    def check_polite(url: str, pin: str) -> CheckResult:
+        bucket.take()
+        return check_one(url, pin, shared_session or sessions[pin])
+
+    # The whole pincode × product matrix shares one pool (I/O bound), so the next pincode's pages are already
+    # in flight while this one's results are handled; results are still handled per pincode, in order
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls) * len(pins)))) as pool:
+        futures = {pin: [pool.submit(check_polite, url, pin) for url in urls] for pin in pins}
+
+        for pin in pins:
+            log.info(f"Pincode: {pin}")
+            if pin in notes:
+                log.info(notes[pin])
+
+            for fut in futures[pin]:
+                result = fut.result()
+                pid = result.product_id or result.url
+                key = f"{pid}|{pin}"
+                prev = state.get(key, {})
+                state[key] = {
+                    "url": result.url,
+                    "slug": result.slug,
+                    "title": result.title,
+                    "status": result.status,
                     "pincode": pin,
-                    "from": prev["status"],
-                    "to": result["status"],
-                    "url": result["url"],
-                })
-                if result["status"] == "in_stock":
-                    print(f"  [BACK IN STOCK] {result.get('title') or result.get('slug')}")
+                }
 
-            label = result["status"].upper() if result["status"] != "error" else (result.get("error") or "ERROR")
-            print(f"  {result.get('title') or result.get('slug') or pid}: {label}")
+                if result.status == "error":
+                    _send_telegram_error(config, result.title or result.slug or pid, pin, result.url, result.error or "Check failed")
+                if prev.get("status") and result.status != prev["status"]:
+                    changes.append({
+                        "title": result.title or result.slug or pid,
+                        "pincode": pin,
+                        "from": prev["status"],
+                        "to": result.status,
+                        "url": result.url,
+                    })
+                    if result.status == "in_stock":
+                        log.info(f"  [BACK IN STOCK] {result.title or result.slug}")
 
-            time.sleep(8)
+                label = result.status.upper() if result.status != "error" else (result.error or "ERROR")
+                log.info(f"  {result.title or result.slug or pid}: {label}")
 
-        print()
+            # Flush after each pincode so an interrupted run keeps what it has checked
+            save_json(STATE_FILE, state, indent=False)
+            log.info("")
 
-    save_json(STATE_FILE, state)
+    _persist_build_id(cache)
+    _persist_latlng(cache)
+    save_json(SESSION_CACHE_FILE, cache, indent=False)
 
     if changes:
-        print("--- Changes ---")
+        log.info("--- Changes ---")
         for c in changes:
-            print(f"  {c['title']} (@ {c['pincode']}): {c['from']} -> {c['to']}")
+            log.info(f"  {c['title']} (@ {c['pincode']}): {c['from']} -> {c['to']}")
         in_stock_changes = [c for c in changes if c.get("to") == "in_stock"]
         if in_stock_changes:
-            print(f"Sending Telegram for {len(in_stock_changes)} in_stock alert(s)...")
+            log.info(f"Sending Telegram for {len(in_stock_changes)} in_stock alert(s)...")
             for c in in_stock_changes:
-                _send_telegram_in_stock(config, c)
+                _TG_BATCHER.enqueue(config, c)
+    _TG_BATCHER.flush()
+    _wait_telegram()
 
 
 # -----------------------------------------------------------------------------
@@ -1365,7 +2256,45 @@ def run(product_urls: list[str], pincodes: list[str], session_file: str | Path |
 # -----------------------------------------------------------------------------
 
 
+# Servers drop idle keep-alive sockets after about a minute; longer sleeps warm the pool again just before the tick
+KEEPALIVE_IDLE = 60
+_WARMUP_LEAD = 3
+
+
+def _preconnect(url: str = "https://www.bigbasket.com/") -> None:
+    """Open (or refresh) a pooled keep-alive socket to url's host on the shared adapter; the response is ignored."""
+    try:
+        _HTTP.head(url, headers=HEADERS, timeout=5, allow_redirects=False).close()
+    except requests.RequestException:
+        pass
+
+
+def _loop(fn, interval_s: float, warm=None) -> None:
+    """
+    Call fn once, then every interval_s seconds measured start to start, so the run time is not added on top
+    of the interval. If a run overruns, the missed ticks are skipped instead of running back to back.
+    interval_s <= 0 runs fn once. If warm is given and the wait is longer than KEEPALIVE_IDLE, warm() is called
+    a few seconds before the tick, so the run starts on a fresh connection instead of paying TCP+TLS itself.
+    """
+    next_tick = time.monotonic()
+    while True:
+        fn()
+        if interval_s <= 0:
+            return
+        next_tick += interval_s
+        delay = next_tick - time.monotonic()
+        if delay < 0:
+            next_tick, delay = time.monotonic(), 0.0
+        log.info(f"Sleeping {delay / 60:.1f} minutes...")
+        if warm is not None and delay > KEEPALIVE_IDLE:
+            time.sleep(delay - _WARMUP_LEAD)
+            warm()
+            delay = next_tick - time.monotonic()
+        time.sleep(max(0.0, delay))
+
+
 def main():
+    _setup_log_output(queued=True)
     parser = argparse.ArgumentParser(description="BigBasket stock checker by pincode")
     parser.add_argument("urls", nargs="*", help="Product URLs (optional if using -c)")
     parser.add_argument("-c", "--config", action="store_true", help="Use config.json")
@@ -1385,9 +2314,9 @@ def main():
             config_path = BASE / config_path
     config = load_json(config_path, {})
     if args.test_telegram:
-        print("Sending test Telegram message...")
-        ok = _send_telegram(config, "Test from BigBasket tracker – if you see this, alerts are working.", silent_if_missing=False)
-        print("Done." if ok else "Failed (check token, chat_id, topic_id in config).")
+        log.info("Sending test Telegram message...")
+        ok = _send_telegram_sync(config, "Test from BigBasket tracker – if you see this, alerts are working.", silent_if_missing=False)
+        log.info("Done." if ok else "Failed (check token, chat_id, topic_id in config).")
         return
     urls = list(args.urls) if args.urls else (config.get("product_urls") or config.get("urls") or [])
     if args.config or not urls:
@@ -1417,7 +2346,7 @@ def main():
         return
 
     if not urls:
-        print("No product URLs. Add product_urls in config.json or pass URLs.", file=sys.stderr)
+        log.warning("No product URLs. Add product_urls in config.json or pass URLs.")
         sys.exit(1)
     loop_minutes = max(0, float(args.loop or 0))
     if use_browser:
@@ -1425,24 +2354,39 @@ def main():
             pincodes = ["browser"]
         if args.headless:
             config = {**(config or {}), "headless": True}
-        while True:
+        if loop_minutes <= 0:
             run_with_browser(urls, pincodes, config=config)
-            if loop_minutes <= 0:
-                break
-            print(f"Sleeping {loop_minutes} minutes...")
-            time.sleep(loop_minutes * 60)
+            return
+        # --loop: keep Chrome open between runs (no cold start per tick); restart it now and then to bound memory
+        drivers = []
+        ticks = 0
+
+        def tick():
+            nonlocal ticks
+            try:
+                run_with_browser(urls, pincodes, config=config, drivers=drivers)
+            except Exception as e:
+                log.warning(f"Browser run failed: {e} (restarting Chrome next run)")
+            ticks += 1
+            if ticks % BROWSER_RESTART_EVERY == 0:
+                _quit_drivers(drivers)
+
+        try:
+            _loop(tick, loop_minutes * 60)
+        finally:
+            _quit_drivers(drivers)
     else:
         if not pincodes:
-            print("No pincodes. Add pincodes in config.json or use -p.", file=sys.stderr)
+            log.warning("No pincodes. Add pincodes in config.json or use -p.")
             sys.exit(1)
         session_file = config.get("session_file")
-        while True:
-            run(urls, pincodes, session_file=session_file, config=config)
-            if loop_minutes <= 0:
-                break
-            print(f"Sleeping {loop_minutes} minutes...")
-            time.sleep(loop_minutes * 60)
+        _loop(lambda: run(urls, pincodes, session_file=session_file, config=config), loop_minutes * 60, warm=_preconnect)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        _TG_BATCHER.close()
+        _TG_POOL.shutdown(wait=True)
+        _stop_log_output()  # last: the Telegram threads above still log
@@ -3,24 +3,183 @@ Verify stock for Fresho Cauliflower at pincode 122001.
 Uses HAR flow: places autocomplete -> details -> serviceable, then fetch product data.
 """
 import json
-import uuid
+import logging
+import os
+import queue
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+from operator import methodcaller
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode Content-Encoding: br)
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip, deflate"
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import ijson  # optional: stream sysgenpd pages product by product (picks the yajl2_c backend when built)
+except ImportError:
+    ijson = None
 
 BASE = "https://www.bigbasket.com"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Referer": BASE + "/",
     "Accept": "application/json, */*",
+    # br only when brotli/brotlicffi is installed to decode it
+    "Accept-Encoding": _ACCEPT_ENCODING,
     "x-channel": "BB-WEB",
     "x-entry-context-id": "100",
 }
+TARGET_SKU = 10000074
+# x.get("pstat") as a C-level callable; entries without pstat give None (itemgetter would raise KeyError)
+_pstat = methodcaller("get", "pstat")
+
+log = logging.getLogger("verify_122001")
+
+# Slug lookup + pages 1-5 in flight at once; later pages (up to MAX_PAGES) reuse the same workers
+PAGE_WORKERS = 6
+FIRST_PAGES = 5
+MAX_PAGES = 50
+
+# One pooled session for every step (keep-alive: one TCP/TLS handshake, reused by the concurrent page fetches).
+# requests speaks HTTP/1.1 only, so concurrency comes from parallel keep-alive sockets: everything goes to one
+# host, so one host pool with a socket per page worker (none opened and then discarded for lack of room).
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=PAGE_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+))
+
+def _json(r):
+    """Decode a response body from its raw bytes (no charset detection / text decode)."""
+    return _json_loads(r.content)
+
+
+def _sample(r, n):
+    """First n bytes of the body as text, for error output (no charset detection or full-body decode like r.text)."""
+    return r.content[:n].decode("utf-8", "replace")
+
+
+def _prepare_sysgenpd(s, slug):
+    """Prepared sysgenpd GET for slug (URL, params, headers and cookies encoded once; pages only append &page=N)."""
+    return s.prepare_request(requests.Request("GET", BASE + "/custompage/sysgenpd/", params={"type": "pc", "slug": slug}))
+
+
+def _sysgenpd(s, prepared, page=None):
+    """Send one sysgenpd listing page (page=None for the unpaginated slug lookup). Body is left unread (stream=True)."""
+    if page is not None:
+        prepared = prepared.copy()
+        prepared.url = f"{prepared.url}&page={page}"
+    return s.send(prepared, timeout=20, stream=True)
+
+
+_TAB_PREFIX = "tab_info.item"
+_PRODUCT_PREFIX = "tab_info.item.product_info.products.item"
+_TOT_PAGES_PREFIX = "tab_info.item.product_info.tot_pages"
+
+
+def _scan_products(r, sku=TARGET_SKU):
+    """
+    Look for sku (int) in a sysgenpd response; the API's sku may be an int or a numeric string. Returns (product or None, products seen, first sku, tot_pages).
+    With ijson the body is parsed event by event and only one product dict exists at a time;
+    the scan stops at the match, so the rest of the page is never parsed.
+    """
+    skus = (sku, str(sku))  # plain equality per product, no str() of every sku
+    count, first_sku, tot_pages = 0, None, 1
+    if ijson is None:
+        tab = _json(r).get("tab_info", [{}])[0]
+        pi = tab.get("product_info", {})
+        prods = pi.get("products", []) if isinstance(pi, dict) else []
+        tot_pages = pi.get("tot_pages", 1) if isinstance(pi, dict) else 1
+        found = next((p for p in prods if p.get("sku") in skus), None)
+        return found, len(prods), prods[0].get("sku") if prods else None, tot_pages
+    r.raw.decode_content = True
+    builder = None
+    for prefix, event, value in ijson.parse(r.raw, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event == "end_map" and prefix == _PRODUCT_PREFIX:
+                p, builder = builder.value, None
+                count += 1
+                if first_sku is None:
+                    first_sku = p.get("sku")
+                if p.get("sku") in skus:
+                    return p, count, first_sku, tot_pages
+        elif event == "start_map" and prefix == _PRODUCT_PREFIX:
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix == _TOT_PAGES_PREFIX:
+            tot_pages = value
+        elif prefix == _TAB_PREFIX and event == "end_map":
+            break  # only the first tab, like the non-streamed path (tab_info[0])
+    return None, count, first_sku, tot_pages
+
+
+# Autocomplete answers {"predictions": [...]} (or "results"/"places", or a bare list); ids and coordinates
+# also come under a few names. Lookups go through these tuples instead of per-call or-chains.
+_PLACE_LIST_KEYS = ("predictions", "results", "places")
+_PLACE_ID_KEYS = ("place_id", "id", "placeId")
+
+
+def _place_list(places):
+    if isinstance(places, list):
+        return places
+    if isinstance(places, dict):
+        return next((places[k] for k in _PLACE_LIST_KEYS if places.get(k)), [])
+    return []
+
+
+def _latlng(details):
+    """(lat, lng) from top-level lat/lng (or latitude/longitude), else geometry.location; None where missing."""
+    loc = (details.get("geometry") or {}).get("location") or {}
+    return (
+        details.get("lat") or details.get("latitude") or loc.get("lat"),
+        details.get("lng") or details.get("longitude") or loc.get("lng"),
+    )
+
 
 def main():
-    s = requests.Session()
-    s.headers.update(HEADERS)
+    """Run the check. Output is queued while it runs and written by a listener thread, so page workers never wait on stdout."""
+    q = queue.SimpleQueue()
+    queue_handler = QueueHandler(q)
+    out = logging.StreamHandler(sys.stdout)
+    out.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(q, out)
+    log.addHandler(queue_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener.start()
+    try:
+        _verify()
+    finally:
+        listener.stop()  # writes everything still queued
+        log.removeHandler(queue_handler)
+
+
+def _verify():
+    s = SESSION
 
     pincode = "122001"
-    token = str(uuid.uuid4()).replace("-", "")[:32]
+    token = os.urandom(16).hex()
 
     # 1. Places autocomplete
     r1 = s.get(
@@ -28,49 +187,38 @@ def main():
         params={"inputText": pincode, "token": token},
         timeout=15,
     )
-    print("1. Autocomplete status:", r1.status_code)
+    log.info(f"1. Autocomplete status: {r1.status_code}")
     if not r1.ok:
-        print("   Body:", r1.text[:300])
+        log.info(f"   Body: {_sample(r1, 300)}")
         return
-    places = r1.json()
+    places = _json(r1)
     if not places:
-        print("   No places found for pincode", pincode)
+        log.info(f"   No places found for pincode {pincode}")
         return
-    # Response can be list or dict with predictions/results
-    if isinstance(places, dict):
-        plist = places.get("predictions") or places.get("results") or places.get("places") or []
-    else:
-        plist = places
+    plist = _place_list(places)
     if not plist:
-        print("   Empty places list. Response keys:", list(places.keys()) if isinstance(places, dict) else "list len " + str(len(places)))
+        log.info(f"   Empty places list. Response keys: {list(places.keys()) if isinstance(places, dict) else 'list len ' + str(len(places))}")
         return
-    first = plist[0] if isinstance(plist[0], dict) else plist
-    place_id = first.get("place_id") or first.get("id") or first.get("placeId") or first.get("place_id")
+    first = plist[0]
+    place_id = next((first[k] for k in _PLACE_ID_KEYS if first.get(k)), None) if isinstance(first, dict) else None
     if not place_id:
-        print("   First place keys:", list(first.keys()) if isinstance(first, dict) else first)
+        log.info(f"   First place keys: {list(first.keys()) if isinstance(first, dict) else first}")
         return
-    print("   First place id:", place_id)
+    log.info(f"   First place id: {place_id}")
 
     # 2. Place details (get lat/lng)
-    token2 = str(uuid.uuid4()).replace("-", "")[:32]
+    token2 = os.urandom(16).hex()
     r2 = s.get(
         BASE + "/places/v1/places/details/",
         params={"placeId": place_id, "token": token2},
         timeout=15,
     )
-    print("2. Details status:", r2.status_code)
+    log.info(f"2. Details status: {r2.status_code}")
     if not r2.ok:
-        print("   Body:", r2.text[:300])
+        log.info(f"   Body: {_sample(r2, 300)}")
         return
-    details = r2.json()
-    lat = details.get("lat") or details.get("latitude")
-    lng = details.get("lng") or details.get("longitude")
-    if lat is None or lng is None:
-        # try nested
-        geo = details.get("geometry", {}).get("location", details)
-        lat = lat or geo.get("lat")
-        lng = lng or geo.get("lng")
-    print("   Lat/Lng:", lat, lng)
+    lat, lng = _latlng(_json(r2))
+    log.info(f"   Lat/Lng: {lat} {lng}")
 
     # 3. Serviceable (set location)
     r3 = s.get(
@@ -78,71 +226,103 @@ def main():
         params={"lat": lat, "lng": lng, "send_all_serviceability": "true"},
         timeout=15,
     )
-    print("3. Serviceable status:", r3.status_code)
-    print("   Cookies after serviceable:", list(s.cookies.keys()))
+    log.info(f"3. Serviceable status: {r3.status_code}")
+    log.info(f"   Cookies after serviceable: {list(s.cookies.keys())}")
 
     # 4. Try Next.js product API (buildId from HAR)
     build_id = "TiBvbC2dBTBqbHRDcdku3"
     pd_url = f"{BASE}/_next/data/{build_id}/pd/10000074/fresho-cauliflower-1-pc.json"
     r4 = s.get(pd_url, params={"params": ["10000074", "fresho-cauliflower-1-pc"]}, timeout=15)
-    print("4. Next.js product status:", r4.status_code)
-    if r4.ok and r4.text:
+    log.info(f"4. Next.js product status: {r4.status_code}")
+    if r4.ok and r4.content:
         try:
-            data = r4.json()
-            print("   Keys:", list(data.keys()))
+            data = _json(r4)
+            log.info(f"   Keys: {list(data.keys())}")
             if "pageProps" in data:
                 pp = data["pageProps"]
-                print("   pageProps keys:", list(pp.keys())[:25])
+                log.info(f"   pageProps keys: {list(pp.keys())[:25]}")
         except Exception as e:
-            print("   Parse error:", e)
-            print("   Body sample:", r4.text[:400])
-
-    # 5a. Try slug fresho-cauliflower-1-pc with session (maybe location-specific)
-    r5a = s.get(BASE + "/custompage/sysgenpd/", params={"type": "pc", "slug": "fresho-cauliflower-1-pc"}, timeout=15)
-    if r5a.ok:
-        d = r5a.json()
-        tab = d.get("tab_info", [{}])[0]
-        pi = tab.get("product_info", {})
-        prods = pi.get("products", []) if isinstance(pi, dict) else []
-        found = next((p for p in prods if str(p.get("sku")) == "10000074"), None)
-        if found:
-            av = found.get("store_availability", [])
-            in_stock = any(x.get("pstat") == "A" for x in av)
-            print("5a. Found 10000074 via slug fresho-cauliflower-1-pc. IN_STOCK:", in_stock)
-        else:
-            print("5a. Slug fresho-cauliflower-1-pc: count", len(prods), ", first sku", prods[0].get("sku") if prods else None)
-
-    # 5b. Sysgenpd fresh-vegetables - paginate to find product 10000074
+            log.info(f"   Parse error: {e}")
+            log.info(f"   Body sample: {_sample(r4, 400)}")
+
+    # 5a/5b. Slug lookup and fresh-vegetables pages 1-5 are independent: issue them all at once
+    # (pages past 5 follow once page 1 reports tot_pages)
     slug = "fresh-vegetables"
-    for page in range(1, 6):
-        r5 = s.get(
-            BASE + "/custompage/sysgenpd/",
-            params={"type": "pc", "slug": slug, "page": page},
-            timeout=20,
-        )
+    with ThreadPoolExecutor(PAGE_WORKERS) as ex:
+        f5a = ex.submit(_fetch_and_scan, s, _prepare_sysgenpd(s, "fresho-cauliflower-1-pc"))
+        listing = _prepare_sysgenpd(s, slug)
+
+        def fetch_page(page):
+            return ex.submit(_fetch_and_scan, s, listing, page)
+
+        page_of = {fetch_page(page): page for page in range(1, FIRST_PAGES + 1)}
+
+        # 5a. Try slug fresho-cauliflower-1-pc with session (maybe location-specific)
+        r5a, scan = f5a.result()
+        if scan:
+            found, count, first_sku, _ = scan
+            if found:
+                av = found.get("store_availability", [])
+                in_stock = "A" in map(_pstat, av)
+                log.info(f"5a. Found 10000074 via slug fresho-cauliflower-1-pc. IN_STOCK: {in_stock}")
+            else:
+                log.info(f"5a. Slug fresho-cauliflower-1-pc: count {count}, first sku {first_sku}")
+
+        _scan_pages(page_of, fetch_page, slug)
+
+
+def _fetch_and_scan(s, prepared, page=None, sku=TARGET_SKU):
+    """Worker: fetch one sysgenpd page and scan it for sku. Returns (response, _scan_products result or None if not ok)."""
+    r = _sysgenpd(s, prepared, page)
+    try:
+        return r, (_scan_products(r, sku) if r.ok else None)
+    finally:
+        r.close()  # streamed body: release the connection even if the scan stopped early
+
+
+def _scan_pages(page_of, fetch_page, slug):
+    """
+    5b. Sysgenpd fresh-vegetables - handle pages as they complete; on the first hit, cancel pages not yet started.
+    Once page 1 (without the product) gives tot_pages, the remaining pages up to MAX_PAGES are queued too;
+    the pool bounds how many are in flight. Listings are not ordered by SKU, so there is no page to guess:
+    every page is scanned. If no page has product 10000074, report in page order.
+    """
+    pending = set(page_of)
+    done = {}
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in finished:
+            page = page_of[fut]
+            r5, scan = fut.result()
+            if scan and scan[0]:
+                for other in pending:
+                    other.cancel()
+                found = scan[0]
+                av = found.get("store_availability", [])
+                in_stock = "A" in map(_pstat, av)
+                log.info(f"5. Found 10000074 on page {page}")
+                log.info(f"   store_availability pstat: {list(map(_pstat, islice(av, 8)))}")
+                log.info(f"   IN_STOCK: {in_stock}")
+                log.info(f"   Product: {(found.get('p_desc') or '')[:50]}")
+                return
+            done[page] = (r5, scan)
+            if page == 1 and scan:
+                for more in range(FIRST_PAGES + 1, min(scan[3], MAX_PAGES) + 1):
+                    fut = fetch_page(more)
+                    page_of[fut] = more
+                    pending.add(fut)
+
+    for page in sorted(done):
+        r5, scan = done[page]
         if not r5.ok:
-            print("5. Sysgenpd page", page, "status:", r5.status_code)
-            break
-        d = r5.json()
-        tab = d.get("tab_info", [{}])[0]
-        pi = tab.get("product_info", {})
-        prods = pi.get("products", []) if isinstance(pi, dict) else []
-        tot_pages = pi.get("tot_pages", 1) if isinstance(pi, dict) else 1
-        found = next((p for p in prods if str(p.get("sku")) == "10000074"), None)
-        if found:
-            av = found.get("store_availability", [])
-            pstats = [x.get("pstat") for x in av]
-            in_stock = any(p == "A" for p in pstats)
-            print("5. Found 10000074 on page", page)
-            print("   store_availability pstat:", pstats[:8])
-            print("   IN_STOCK:", in_stock)
-            print("   Product:", (found.get("p_desc") or "")[:50])
-            break
+            log.info(f"5. Sysgenpd page {page} status: {r5.status_code}")
+            return
+        tot_pages = scan[3]
         if page >= tot_pages:
-            print("5. Product 10000074 not in", tot_pages, "pages of", slug)
-            break
-    else:
-        print("5. Product 10000074 not in first 5 pages")
+            log.info(f"5. Product 10000074 not in {tot_pages} pages of {slug}")
+            return
+    log.info(f"5. Product 10000074 not in first {len(done)} pages")
+
 
 if __name__ == "__main__":
     main()